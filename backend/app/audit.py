@@ -6,7 +6,8 @@ from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.models import AuditLog, AuditAction, User
+from app.audit_queue import audit_queue
+from app.models import AuditLog, AuditAction, User, uuid7
 
 
 async def log_audit(
@@ -30,9 +31,15 @@ async def log_audit(
         ip_address: The IP address of the client.
         
     Returns:
-        The created AuditLog object.
+        The created AuditLog object. When the background writer is running
+        the entry is queued and written in a later batch, so the returned
+        object is not yet persisted.
     """
+    # id and created_at are stamped now rather than at write time, so a
+    # queued entry keeps the time of the action, not of its batch
     log = AuditLog(
+        id=uuid7(),
+        created_at=datetime.now(timezone.utc),
         actor_id=actor.id if actor else None,
         action=action,
         resource_type=resource_type,
@@ -40,9 +47,13 @@ async def log_audit(
         details=details,
         ip_address=ip_address
     )
+    if audit_queue.running:
+        audit_queue.put(log)
+        return log
+    
+    # No writer (scripts, tests): write through the caller's session
     db.add(log)
     await db.commit()
-    await db.refresh(log)
     return log
 
 
@@ -73,22 +84,27 @@ async def get_audit_logs(
     Returns:
         List of AuditLog objects.
     """
-    query = select(AuditLog)
-    
+    conditions = []
     if actor_id:
-        query = query.where(AuditLog.actor_id == actor_id)
+        conditions.append(AuditLog.actor_id == actor_id)
     if action:
-        query = query.where(AuditLog.action == action)
+        conditions.append(AuditLog.action == action)
     if resource_type:
-        query = query.where(AuditLog.resource_type == resource_type)
+        conditions.append(AuditLog.resource_type == resource_type)
     if resource_id:
-        query = query.where(AuditLog.resource_id == resource_id)
+        conditions.append(AuditLog.resource_id == resource_id)
     if start_date:
-        query = query.where(AuditLog.created_at >= start_date)
+        conditions.append(AuditLog.created_at >= start_date)
     if end_date:
-        query = query.where(AuditLog.created_at <= end_date)
+        conditions.append(AuditLog.created_at <= end_date)
     
-    query = query.offset(skip).limit(limit).order_by(AuditLog.created_at.desc())
+    query = (
+        select(AuditLog)
+        .where(*conditions)
+        .order_by(AuditLog.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
     
     result = await db.execute(query)
     return result.scalars().all()
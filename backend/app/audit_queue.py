@@ -0,0 +1,153 @@
+"""Background batching of audit log writes."""
+import asyncio
+import logging
+from typing import Optional
+
+import orjson
+from sqlalchemy import insert
+
+from app.database import engine, get_db_context
+from app.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Columns written for queued entries; log_audit stamps id and created_at when
+# the action happens, so both are written as given rather than defaulted
+_COLUMNS = ["id", "created_at", "actor_id", "action", "resource_type", "resource_id", "details", "ip_address"]
+
+
+# =============================================================================
+# Audit Log Queue
+# =============================================================================
+class AuditLogQueue:
+    """Buffers audit log entries and writes them in batches.
+
+    A single background task collects up to ``batch_size`` entries, or
+    whatever arrived within ``flush_interval`` seconds of the first one,
+    and commits them in one transaction.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 0.5):
+        self._queue: asyncio.Queue[Optional[AuditLog]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+
+    @property
+    def running(self) -> bool:
+        """Whether the background writer is accepting entries."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background writer task."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Audit log writer started")
+
+    async def stop(self) -> None:
+        """Stop the writer after flushing every queued entry."""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+        logger.info("Audit log writer stopped")
+
+    def put(self, log: AuditLog) -> None:
+        """Queue an audit log entry for writing.
+
+        Args:
+            log: The unsaved AuditLog object, with ``id`` and ``created_at``
+                already set.
+        """
+        self._queue.put_nowait(log)
+
+    async def _run(self) -> None:
+        """Drain the queue in batches until the stop sentinel is seen."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        log = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        log = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                if log is None:
+                    stopping = True
+                    break
+                batch.append(log)
+            await self._write(batch)
+
+    async def _write(self, batch: list[AuditLog]) -> None:
+        """Commit a batch of audit log entries in a single transaction.
+
+        On PostgreSQL the batch is streamed with COPY; if that fails, or on
+        other databases, it is written with one multi-row Core INSERT.
+        """
+        if engine.dialect.driver == "asyncpg":
+            try:
+                await self._copy(batch)
+                return
+            except Exception as e:
+                logger.warning(f"COPY of {len(batch)} audit log entries failed, falling back to INSERT: {e}")
+        try:
+            await self._insert(batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} audit log entries: {e}")
+
+    async def _insert(self, batch: list[AuditLog]) -> None:
+        """Write a batch with a Core INSERT executemany.
+
+        The batch goes out as one multi-row statement without ORM change
+        tracking or RETURNING.
+        """
+        async with get_db_context() as session:
+            await session.execute(insert(AuditLog), [
+                {column: getattr(log, column) for column in _COLUMNS}
+                for log in batch
+            ])
+
+    async def _copy(self, batch: list[AuditLog]) -> None:
+        """Stream a batch into audit_logs with PostgreSQL COPY.
+
+        COPY skips the per-row statement overhead of an INSERT batch; the
+        rows bypass the ORM, so column types are converted here. The COPY
+        runs on the session's connection, so it commits or rolls back with
+        the session's transaction.
+        """
+        action_type = AuditLog.__table__.c.action.type
+        records = [
+            (
+                log.id,
+                log.created_at,
+                log.actor_id,
+                action_type.process_bind_param(log.action, None),
+                log.resource_type,
+                log.resource_id,
+                orjson.dumps(log.details).decode() if log.details is not None else None,
+                log.ip_address,
+            )
+            for log in batch
+        ]
+        async with get_db_context() as session:
+            conn = await session.connection()
+            # The asyncpg adapter begins its transaction on the first
+            # statement, so issue one before COPY joins it
+            await conn.exec_driver_sql("SELECT 1")
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                AuditLog.__tablename__, records=records, columns=_COLUMNS
+            )
+
+
+# Global audit log queue instance
+audit_queue = AuditLogQueue()
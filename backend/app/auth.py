@@ -1,22 +1,34 @@
 """Authentication utilities with JWT and Argon2id password hashing."""
+import asyncio
+import base64
+import hashlib
+import hmac
 import os
 import secrets
-import uuid
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 import logging
+from calendar import timegm
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
+import orjson
 from jose import jwt, JWTError
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError, InvalidHash
+from argon2.exceptions import VerifyMismatchError
+from argon2.low_level import ARGON2_VERSION, Type, verify_secret
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.cache import TTLCache
 from app.config import settings
-from app.models import User, UserRole
+from app.models import User, UserRole, InviteToken, PasswordResetToken, RefreshToken, uuid7
 from app.database import get_db
 
 logger = logging.getLogger(__name__)
@@ -24,16 +36,39 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 # Argon2id Password Hashing (Pi 5 optimized)
 # =============================================================================
+# Lanes beyond the available cores only add scheduling overhead, so the
+# configured parallelism (4 for the Pi 5) is capped at the host's core count.
+ARGON2_PARALLELISM = min(
+    int(os.getenv("ARGON2_PARALLELISM", settings.argon2_parallelism)),
+    os.cpu_count() or 1,
+)
+
 argon2_hasher = PasswordHasher(
     time_cost=int(os.getenv("ARGON2_TIME_COST", settings.argon2_time_cost)),
     memory_cost=int(os.getenv("ARGON2_MEMORY_COST", settings.argon2_memory_cost)),
-    parallelism=int(os.getenv("ARGON2_PARALLELISM", settings.argon2_parallelism)),
+    parallelism=ARGON2_PARALLELISM,
     hash_len=32,
     salt_len=16,
 )
 
 
-def hash_password(password: str) -> str:
+# Encoded-hash prefix produced by argon2_hasher. Hashes created with the current
+# parameters go straight to the low-level verifier; anything else (legacy
+# parameters, other variants) falls back to PasswordHasher.verify.
+_ARGON2_PREFIX = (
+    f"$argon2id$v={ARGON2_VERSION}$m={argon2_hasher.memory_cost},"
+    f"t={argon2_hasher.time_cost},p={argon2_hasher.parallelism}$"
+)
+
+# Argon2 is CPU- and memory-bound, so hashing runs on a dedicated pool sized to
+# the hash parallelism instead of blocking the event loop or crowding the
+# default executor.
+_password_executor = ThreadPoolExecutor(
+    max_workers=ARGON2_PARALLELISM, thread_name_prefix="argon2"
+)
+
+
+def _hash_password_sync(password: str) -> str:
     """Hash a password using Argon2id.
     
     Args:
@@ -45,7 +80,7 @@ def hash_password(password: str) -> str:
     return argon2_hasher.hash(password)
 
 
-def verify_password(password: str, hashed: str) -> bool:
+def _verify_password_sync(password: str, hashed: str) -> bool:
     """Verify a password against a hash.
     
     Args:
@@ -54,17 +89,148 @@ def verify_password(password: str, hashed: str) -> bool:
         
     Returns:
         True if the password matches, False otherwise.
+        
+    Raises:
+        InvalidHash: If a stored Argon2 hash is corrupt.
     """
+    if not hashed or not hashed.startswith("$argon2"):
+        return False
     try:
+        if hashed.startswith(_ARGON2_PREFIX):
+            return verify_secret(hashed.encode("ascii"), password.encode("utf-8"), Type.ID)
         return argon2_hasher.verify(hashed, password)
-    except (VerifyMismatchError, InvalidHash, Exception) as e:
-        logger.warning(f"Password verification failed: {e}")
+    except VerifyMismatchError:
         return False
 
 
+# Hash of a random password. Logins without a stored hash are verified against
+# it, so they take as long as a wrong password and do not reveal the account.
+DUMMY_PASSWORD_HASH = _hash_password_sync(os.urandom(16).hex())
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password using Argon2id without blocking the event loop.
+    
+    Args:
+        password: The plain text password.
+        
+    Returns:
+        The hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, _hash_password_sync, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    """Verify a password against a hash without blocking the event loop.
+    
+    Args:
+        password: The plain text password.
+        hashed: The hashed password to compare against.
+        
+    Returns:
+        True if the password matches, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, _verify_password_sync, password, hashed)
+
+
 # =============================================================================
 # JWT Token Management
 # =============================================================================
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+def _b64url(data: bytes) -> bytes:
+    """Base64url-encode without padding, as used in JWS."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# The header is identical for every token we issue, so it is serialized once
+_JWT_HEADER_B64 = _b64url(orjson.dumps({"alg": settings.jwt_algorithm, "typ": "JWT"}, option=orjson.OPT_SORT_KEYS))
+_JWT_HEADER_PREFIX = _JWT_HEADER_B64.decode("ascii") + "."
+
+
+def _encode_token(payload: dict) -> str:
+    """Encode and sign a JWT using the precomputed header.
+    
+    Produces the same token as ``jwt.encode``. Non-HMAC algorithms fall back
+    to ``jwt.encode``.
+    
+    Args:
+        payload: The token claims; datetime exp/iat values are converted to
+            epoch seconds.
+        
+    Returns:
+        The encoded JWT.
+    """
+    digest = _HMAC_DIGESTS.get(settings.jwt_algorithm)
+    if digest is None:
+        return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    
+    claims = {
+        key: timegm(value.utctimetuple()) if isinstance(value, datetime) else value
+        for key, value in payload.items()
+    }
+    signing_input = _JWT_HEADER_B64 + b"." + _b64url(orjson.dumps(claims))
+    signature = hmac.new(settings.jwt_secret.encode("utf-8"), signing_input, digest).digest()
+    return (signing_input + b"." + _b64url(signature)).decode("utf-8")
+
+
+def _decode_token(token: str) -> dict:
+    """Verify and decode a JWT issued with the precomputed header.
+    
+    Checks the HMAC signature and the exp/nbf claims like ``jwt.decode``
+    but parses the payload with orjson. Tokens with any other header, or
+    non-HMAC algorithms, fall back to ``jwt.decode``.
+    
+    Args:
+        token: The JWT token to decode.
+        
+    Returns:
+        The decoded token payload.
+        
+    Raises:
+        JWTError: If the token is invalid or expired.
+    """
+    digest = _HMAC_DIGESTS.get(settings.jwt_algorithm)
+    if digest is None or not token.startswith(_JWT_HEADER_PREFIX):
+        return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    
+    signing_input, _, signature = token.rpartition(".")
+    payload_b64 = signing_input[len(_JWT_HEADER_PREFIX):]
+    if not payload_b64 or "." in payload_b64:
+        raise JWTError("Not enough segments")
+    
+    expected = _b64url(
+        hmac.new(settings.jwt_secret.encode("utf-8"), signing_input.encode("utf-8"), digest).digest()
+    )
+    if not hmac.compare_digest(expected, signature.encode("ascii", "replace")):
+        raise JWTError("Signature verification failed.")
+    
+    try:
+        claims = orjson.loads(base64.urlsafe_b64decode(payload_b64 + "=" * (-len(payload_b64) % 4)))
+    except ValueError:
+        raise JWTError("Invalid payload string")
+    if not isinstance(claims, dict):
+        raise JWTError("Invalid payload string: must be a json object")
+    
+    now = int(time.time())
+    exp = claims.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise JWTClaimsError("Expiration Time claim (exp) must be an integer.")
+        if exp < now:
+            raise ExpiredSignatureError("Signature has expired.")
+    nbf = claims.get("nbf")
+    if nbf is not None:
+        if not isinstance(nbf, (int, float)):
+            raise JWTClaimsError("Not Before claim (nbf) must be an integer.")
+        if nbf > now:
+            raise JWTClaimsError("The token is not yet valid (nbf)")
+    return claims
+
+
 def create_access_token(user_id: UUID, email: str, role: UserRole, company_id: UUID) -> str:
     """Create a JWT access token.
     
@@ -77,17 +243,18 @@ def create_access_token(user_id: UUID, email: str, role: UserRole, company_id: U
     Returns:
         The encoded JWT access token.
     """
-    expires = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
+    now = datetime.now(timezone.utc)
+    expires = now + timedelta(minutes=settings.access_token_expire_minutes)
     payload = {
         "sub": str(user_id),
         "email": email,
         "role": role.value,
         "company_id": str(company_id),
         "exp": expires,
-        "iat": datetime.now(timezone.utc),
+        "iat": now,
         "type": "access"
     }
-    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return _encode_token(payload)
 
 
 def create_refresh_token(user_id: UUID) -> tuple[str, str]:
@@ -99,19 +266,46 @@ def create_refresh_token(user_id: UUID) -> tuple[str, str]:
     Returns:
         Tuple of (refresh_token, token_jti).
     """
-    token_jti = uuid.uuid4()  # Unique token ID for rotation tracking
-    expires = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+    token_jti = uuid7()  # Unique, time-ordered token ID for rotation tracking
+    now = datetime.now(timezone.utc)
+    expires = now + timedelta(days=settings.refresh_token_expire_days)
     payload = {
         "sub": str(user_id),
         "jti": str(token_jti),  # Token ID for rotation tracking
         "exp": expires,
-        "iat": datetime.now(timezone.utc),
+        "iat": now,
         "type": "refresh"
     }
-    refresh_token = jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    refresh_token = _encode_token(payload)
     return refresh_token, str(token_jti)
 
 
+# Decoded payloads keyed by raw token. The signature is verified on the first
+# decode; entries never outlive the token's own "exp" claim.
+_token_cache = TTLCache(maxsize=4096, ttl=30)
+
+
+def _decode_cached(token: str) -> dict:
+    """Decode a JWT token, reusing a recently verified payload if available.
+    
+    Args:
+        token: The JWT token to decode.
+        
+    Returns:
+        The decoded token payload.
+        
+    Raises:
+        JWTError: If the token is invalid.
+    """
+    payload = _token_cache.get(token)
+    if payload is None:
+        payload = _decode_token(token)
+        exp = payload.get("exp")
+        if exp is not None:
+            _token_cache.set(token, payload, ttl=exp - time.time())
+    return payload
+
+
 def decode_token(token: str) -> dict:
     """Decode and validate a JWT token.
     
@@ -125,12 +319,7 @@ def decode_token(token: str) -> dict:
         HTTPException: If the token is invalid.
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret,
-            algorithms=[settings.jwt_algorithm]
-        )
-        return payload
+        return _decode_cached(token)
     except JWTError as e:
         logger.warning(f"JWT decode error: {e}")
         raise HTTPException(
@@ -163,13 +352,14 @@ def verify_refresh_token(refresh_token: str) -> UUID:
 # =============================================================================
 # Invite Token Management
 # =============================================================================
-def generate_invite_token() -> str:
-    """Generate a secure invite token.
-    
-    Returns:
-        A URL-safe random token.
-    """
-    return secrets.token_urlsafe(32)
+# Invite and password reset tokens share one generator: 32 random bytes,
+# URL-safe base64 encoded.
+_gen_token = partial(secrets.token_urlsafe, 32)
+
+generate_invite_token = _gen_token
+generate_password_reset_token = _gen_token
+
+INVITE_TOKEN_LIFETIME = timedelta(days=7)
 
 
 def create_invite_token(db: AsyncSession, user_id: UUID, created_by: Optional[UUID] = None) -> "InviteToken":
@@ -183,10 +373,8 @@ def create_invite_token(db: AsyncSession, user_id: UUID, created_by: Optional[UU
     Returns:
         The created InviteToken object.
     """
-    from app.models import InviteToken
-    
-    token_str = generate_invite_token()
-    expires = datetime.now(timezone.utc) + timedelta(days=7)  # 7 day expiry
+    token_str = _gen_token()
+    expires = datetime.now(timezone.utc) + INVITE_TOKEN_LIFETIME
     
     invite = InviteToken(
         token=token_str,
@@ -198,18 +386,42 @@ def create_invite_token(db: AsyncSession, user_id: UUID, created_by: Optional[UU
     return invite
 
 
-# =============================================================================
-# Password Reset Token Management
-# =============================================================================
-def generate_password_reset_token() -> str:
-    """Generate a secure password reset token.
+def create_invite_tokens(
+    db: AsyncSession, user_ids: list[UUID], created_by: Optional[UUID] = None
+) -> list["InviteToken"]:
+    """Create invite tokens for many users at once.
     
+    Reads the random bytes for every token in one call and shares a single
+    expiry timestamp, so onboarding a whole company does not pay the
+    per-token overhead of create_invite_token.
+    
+    Args:
+        db: The database session.
+        user_ids: The UUIDs of the users to invite.
+        created_by: The creator's UUID.
+        
     Returns:
-        A URL-safe random token.
+        The created InviteToken objects, in the order of user_ids.
     """
-    return secrets.token_urlsafe(32)
+    raw = os.urandom(len(user_ids) * 32)
+    expires = datetime.now(timezone.utc) + INVITE_TOKEN_LIFETIME
+    
+    invites = [
+        InviteToken(
+            token=_b64url(raw[i * 32:(i + 1) * 32]).decode("ascii"),
+            user_id=user_id,
+            expires_at=expires,
+            created_by=created_by
+        )
+        for i, user_id in enumerate(user_ids)
+    ]
+    db.add_all(invites)
+    return invites
 
 
+# =============================================================================
+# Password Reset Token Management
+# =============================================================================
 def create_password_reset_token(db: AsyncSession, user_id: UUID) -> "PasswordResetToken":
     """Create a password reset token for a user.
     
@@ -220,9 +432,7 @@ def create_password_reset_token(db: AsyncSession, user_id: UUID) -> "PasswordRes
     Returns:
         The created PasswordResetToken object.
     """
-    from app.models import PasswordResetToken
-    
-    token_str = generate_password_reset_token()
+    token_str = _gen_token()
     expires = datetime.now(timezone.utc) + timedelta(hours=1)  # 1 hour expiry
     
     reset = PasswordResetToken(
@@ -239,6 +449,90 @@ def create_password_reset_token(db: AsyncSession, user_id: UUID) -> "PasswordRes
 # =============================================================================
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
+# Column values of recently authenticated users, keyed by user ID. Rows are
+# cached as plain values and rebuilt per request so every session gets its own
+# tracked instance.
+_user_cache = TTLCache(maxsize=1024, ttl=5)
+# Email -> user ID for the login path; entries resolve through _user_cache,
+# so invalidate_user_cache also invalidates them
+_user_email_index = TTLCache(maxsize=1024, ttl=5)
+_USER_COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs)
+
+
+def invalidate_user_cache(user_id: UUID) -> None:
+    """Drop a user from the authenticated-user cache.
+    
+    Call this whenever a user's row changes (role, activation, password).
+    
+    Args:
+        user_id: The user's UUID.
+    """
+    _user_cache.pop(user_id)
+
+
+def _attach_cached_user(db: AsyncSession, values: dict) -> User:
+    """Attach a user rebuilt from cached column values to the session.
+    
+    Args:
+        db: The database session.
+        values: Column values captured from a previously loaded User.
+        
+    Returns:
+        A persistent User instance bound to the session, loaded without a query.
+    """
+    user = User(**values)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+async def get_user_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
+    """Load a user by ID, reusing recently cached column values.
+    
+    Args:
+        db: The database session.
+        user_id: The user's UUID.
+        
+    Returns:
+        The User attached to the session, or None if it does not exist.
+    """
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return _attach_cached_user(db, cached)
+    
+    user = await db.get(User, user_id)
+    if user:
+        _user_cache.set(user_id, {key: getattr(user, key) for key in _USER_COLUMNS})
+    return user
+
+
+# Built once at import; callers only bind the email
+_USER_BY_EMAIL_STMT = select(User).where(User.email == bindparam("email"))
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    """Load a user by email, reusing recently cached column values.
+    
+    Args:
+        db: The database session.
+        email: The email address.
+        
+    Returns:
+        The User attached to the session, or None if no user has the email.
+    """
+    user_id = _user_email_index.get(email)
+    if user_id is not None:
+        cached = _user_cache.get(user_id)
+        if cached is not None and cached["email"] == email:
+            return _attach_cached_user(db, cached)
+    
+    result = await db.execute(_USER_BY_EMAIL_STMT, {"email": email})
+    user = result.scalar_one_or_none()
+    if user:
+        _user_cache.set(user.id, {key: getattr(user, key) for key in _USER_COLUMNS})
+        _user_email_index.set(email, user.id)
+    return user
+
 
 async def get_current_user(
     token: Optional[str] = Depends(oauth2_scheme),
@@ -270,14 +564,13 @@ async def get_current_user(
         )
     
     user_id = UUID(payload["sub"])
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    
+    user = await get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -296,8 +589,10 @@ def require_role(*allowed_roles: UserRole):
     Returns:
         A dependency function.
     """
+    allowed = frozenset(allowed_roles)
+    
     async def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in allowed_roles:
+        if current_user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions"
@@ -338,7 +633,7 @@ async def require_manager_or_admin(current_user: User = Depends(get_current_user
     Raises:
         HTTPException: If not manager or admin.
     """
-    if current_user.role not in (UserRole.ADMIN, UserRole.MANAGER):
+    if not current_user.is_manager():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Manager or admin access required"
@@ -398,33 +693,32 @@ async def create_and_store_refresh_token(
     Returns:
         Tuple of (refresh_token, token_jti).
     """
-    from app.models import RefreshToken
-    
     # Create new refresh token with unique jti
-    token_jti = uuid.uuid4()
-    expires = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+    token_jti = uuid7()
+    now = datetime.now(timezone.utc)
+    expires = now + timedelta(days=settings.refresh_token_expire_days)
     
     payload = {
         "sub": str(user_id),
         "jti": str(token_jti),
         "exp": expires,
-        "iat": datetime.now(timezone.utc),
+        "iat": now,
         "type": "refresh"
     }
-    refresh_token = jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    refresh_token = _encode_token(payload)
     
     # Revoke all existing refresh tokens for this user (token rotation)
     await db.execute(
         update(RefreshToken)
         .where(RefreshToken.user_id == user_id)
         .where(RefreshToken.revoked_at.is_(None))
-        .values(revoked_at=datetime.now(timezone.utc))
+        .values(revoked_at=now)
     )
     
     # Store new refresh token
     refresh_token_db = RefreshToken(
         user_id=user_id,
-        token_jti=str(token_jti),
+        token_jti=token_jti,
         expires_at=expires
     )
     db.add(refresh_token_db)
@@ -440,20 +734,15 @@ async def revoke_refresh_token(db: AsyncSession, token_jti: str) -> bool:
         token_jti: The JWT ID of the token to revoke.
         
     Returns:
-        True if the token was revoked, False if not found.
+        True if the token was revoked, False if not found or already revoked.
     """
-    from app.models import RefreshToken
-    
     result = await db.execute(
-        select(RefreshToken).where(RefreshToken.token_jti == token_jti)
+        update(RefreshToken)
+        .where(RefreshToken.token_jti == token_jti)
+        .where(RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
     )
-    token = result.scalar_one_or_none()
-    
-    if token and not token.is_revoked:
-        token.revoked_at = datetime.now(timezone.utc)
-        return True
-    
-    return False
+    return result.rowcount > 0
 
 
 async def revoke_all_user_refresh_tokens(db: AsyncSession, user_id: UUID) -> int:
@@ -466,8 +755,6 @@ async def revoke_all_user_refresh_tokens(db: AsyncSession, user_id: UUID) -> int
     Returns:
         Number of tokens revoked.
     """
-    from app.models import RefreshToken
-    
     result = await db.execute(
         update(RefreshToken)
         .where(RefreshToken.user_id == user_id)
@@ -477,39 +764,81 @@ async def revoke_all_user_refresh_tokens(db: AsyncSession, user_id: UUID) -> int
     return result.rowcount
 
 
-async def validate_refresh_token(db: AsyncSession, refresh_token: str) -> Optional[UUID]:
-    """Validate a refresh token against the database.
+def _refresh_token_jti(refresh_token: str) -> Optional[UUID]:
+    """Extract the jti of a well-formed refresh token.
     
     Args:
-        db: The database session.
         refresh_token: The refresh token string.
         
     Returns:
-        User ID if valid, None otherwise.
+        The token's jti, or None if it is not a refresh token.
     """
-    from app.models import RefreshToken
-    
     payload = decode_token(refresh_token)
     
     if payload.get("type") != "refresh":
         return None
     
     token_jti = payload.get("jti")
-    user_id = payload.get("sub")
-    
-    if not token_jti or not user_id:
+    if not token_jti or not payload.get("sub"):
         return None
     
-    result = await db.execute(
-        select(RefreshToken).where(RefreshToken.token_jti == token_jti)
+    try:
+        return UUID(token_jti)
+    except (TypeError, ValueError):
+        return None
+
+
+def _live_refresh_token(token_jti: UUID):
+    """Build the criteria matching an unrevoked, unexpired token by jti."""
+    return (
+        RefreshToken.token_jti == token_jti,
+        RefreshToken.revoked_at.is_(None),
+        RefreshToken.expires_at > datetime.now(timezone.utc),
     )
-    token = result.scalar_one_or_none()
+
+
+async def validate_refresh_token(db: AsyncSession, refresh_token: str) -> Optional[UUID]:
+    """Validate a refresh token against the database.
     
-    if not token or token.is_revoked or token.is_expired:
+    Args:
+        db: The database session.
+        refresh_token: The refresh token string.
+        
+    Returns:
+        User ID if valid, None otherwise.
+    """
+    token_jti = _refresh_token_jti(refresh_token)
+    if token_jti is None:
         return None
     
-    return UUID(user_id)
+    # Only live tokens match; nothing is loaded into the session
+    return await db.scalar(
+        select(RefreshToken.user_id).where(*_live_refresh_token(token_jti))
+    )
+
 
+async def consume_refresh_token(db: AsyncSession, refresh_token: str) -> Optional[UUID]:
+    """Validate and revoke a refresh token in one statement.
+    
+    Two concurrent refreshes with the same token cannot both succeed: only
+    the UPDATE that revokes the live row returns it.
+    
+    Args:
+        db: The database session.
+        refresh_token: The refresh token string.
+        
+    Returns:
+        User ID if the token was live, None otherwise.
+    """
+    token_jti = _refresh_token_jti(refresh_token)
+    if token_jti is None:
+        return None
+    
+    result = await db.execute(
+        update(RefreshToken)
+        .where(*_live_refresh_token(token_jti))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .returning(RefreshToken.user_id)
+    )
+    return result.scalar_one_or_none()
 
-# Re-export for convenience
-from app.models import InviteToken, PasswordResetToken, RefreshToken
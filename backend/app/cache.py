@@ -0,0 +1,75 @@
+"""In-memory TTL cache for hot-path memoization."""
+import time
+from typing import Any, Hashable, Optional
+
+
+# =============================================================================
+# TTL Cache (In-Memory)
+# =============================================================================
+class TTLCache:
+    """Bounded in-memory cache whose entries expire after a time-to-live.
+
+    Entries are evicted lazily on access. When the cache is full, expired
+    entries are purged first, then the oldest inserted entry is dropped.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._data: dict[Hashable, tuple[Any, float]] = {}
+        self._maxsize = maxsize
+        self._ttl = ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value.
+
+        Args:
+            key: The cache key.
+            default: Value returned when the key is missing or expired.
+
+        Returns:
+            The cached value, or default.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+            ttl: Optional per-entry TTL in seconds, capped at the cache TTL.
+        """
+        ttl = self._ttl if ttl is None else min(ttl, self._ttl)
+        if ttl <= 0:
+            return
+        if key not in self._data and len(self._data) >= self._maxsize:
+            self._evict()
+        self._data[key] = (value, time.monotonic() + ttl)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value (expired or not)."""
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self) -> None:
+        """Make room for one entry."""
+        now = time.monotonic()
+        expired = [k for k, (_, expires_at) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        if len(self._data) >= self._maxsize:
+            # Dicts preserve insertion order, so the first key is the oldest
+            del self._data[next(iter(self._data))]
@@ -12,6 +12,18 @@ class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./data/vacation_planner.db"
     sqlite_data_path: str = "./data"
     database_echo: bool = False
+    # Connection pool (server databases only; SQLite uses a single static connection)
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_recycle: int = 1800
+    # Validate connections on checkout; off by default because recycling plus
+    # TCP keepalives already retire dead connections without the extra round-trip
+    database_pool_pre_ping: bool = False
+    # Seconds of idle time before the server starts TCP keepalive probes (asyncpg)
+    database_tcp_keepalives_idle: int = 30
+    # Seconds a /health database ping is reused; keep below the load balancer's
+    # healthy -> unhealthy threshold so outages are still reported promptly
+    health_check_cache_seconds: float = 1.0
     
     # JWT Authentication
     jwt_secret: str = "your-super-secret-key-change-in-production"
@@ -46,6 +58,9 @@ class Settings(BaseSettings):
     
     # CORS
     cors_origins: List[str] = ["http://vacation.local"]
+    # Key rate limits on the leftmost X-Forwarded-For address; only enable
+    # behind a reverse proxy that sets the header
+    trust_proxy: bool = False
     
     # Environment
     environment: str = "development"
@@ -1,18 +1,23 @@
 """Database connection and session management."""
+import asyncio
 import logging
 import os
 from typing import AsyncGenerator
 from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 from sqlalchemy.pool import StaticPool
 from sqlalchemy import event, text
 
+from app.cache import TTLCache
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Last database liveness result
+_db_health_cache = TTLCache(maxsize=1, ttl=settings.health_check_cache_seconds)
+
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
@@ -21,13 +26,39 @@ class Base(DeclarativeBase):
 
 # Get database URL from environment or use default
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/vacation_planner.db")
-
-# Create async engine for SQLite
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+if IS_SQLITE:
+    # SQLite: one shared connection, no pool to validate
+    _engine_options = {
+        "connect_args": {"check_same_thread": False},
+        "poolclass": StaticPool,
+    }
+else:
+    # Server databases: connections are recycled before server-side idle
+    # timeouts can drop them, and pre-ping is opt-in
+    _engine_options = {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+    if "+asyncpg" in DATABASE_URL:
+        # Server-side keepalives detect half-open connections (e.g. after a
+        # NAT or load balancer reset) before a request checks them out
+        _engine_options["connect_args"] = {
+            "server_settings": {
+                "tcp_keepalives_idle": str(settings.database_tcp_keepalives_idle),
+                "tcp_keepalives_interval": "10",
+                "tcp_keepalives_count": "3",
+            }
+        }
+
+# Create async engine
 engine = create_async_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
     echo=settings.database_echo,
+    **_engine_options,
 )
 
 # Session factory
@@ -40,7 +71,6 @@ async_session_maker = async_sessionmaker(
 )
 
 
-@event.listens_for(engine.sync_engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     """Set SQLite PRAGMA optimizations on each new connection."""
     cursor = dbapi_connection.cursor()
@@ -52,16 +82,64 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor.execute("PRAGMA foreign_keys=ON")
     # Set synchronous mode to NORMAL for better performance while maintaining durability
     cursor.execute("PRAGMA synchronous=NORMAL")
+    # Memory-map up to 256MB of the database file so reads avoid read() syscalls
+    cursor.execute("PRAGMA mmap_size=268435456")
+    # Keep temporary tables and sort/index scratch data in memory
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    # Wait up to 5s for a competing writer instead of failing with "database is locked"
+    cursor.execute("PRAGMA busy_timeout=5000")
     cursor.close()
-    logger.info("SQLite PRAGMA optimizations applied: WAL mode, 64MB cache, foreign keys ON, synchronous=NORMAL")
+    logger.info(
+        "SQLite PRAGMA optimizations applied: WAL mode, 64MB cache, foreign keys ON, synchronous=NORMAL, "
+        "256MB mmap, temp_store=MEMORY, busy_timeout=5000"
+    )
+
+
+if IS_SQLITE:
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragma)
+
+
+# =============================================================================
+# Write tracking: sessions only COMMIT when the transaction wrote something
+# =============================================================================
+@event.listens_for(Session, "after_flush")
+def _mark_flush_write(session, flush_context):
+    """Record that a flush sent INSERT/UPDATE/DELETE statements."""
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    """Record that a non-SELECT statement was executed on the session."""
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_write_flag(session):
+    """Reset write tracking once the transaction has ended."""
+    session.info.pop("has_writes", None)
+
+
+def _has_pending_writes(session: AsyncSession) -> bool:
+    """Check whether the session has changes that need a COMMIT."""
+    return bool(
+        session.new or session.dirty or session.deleted or session.info.get("has_writes")
+    )
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency for getting database session."""
+    """Dependency for getting database session.
+    
+    Read-only requests skip the trailing COMMIT; the read transaction is
+    released when the session closes.
+    """
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            if _has_pending_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -91,6 +169,21 @@ async def init_db() -> None:
     logger.info("Database initialized successfully")
 
 
+async def warm_db_pool() -> None:
+    """Open and ping the pool's connections up front.
+    
+    Connections are opened concurrently so the first burst of requests does
+    not pay the connect and handshake cost one at a time.
+    """
+    async def _warm() -> None:
+        async with engine.connect() as conn:
+            await conn.scalar(text("SELECT 1"))
+    
+    size = 1 if IS_SQLITE else settings.database_pool_size
+    await asyncio.gather(*(_warm() for _ in range(size)))
+    logger.info(f"Database pool warmed with {size} connection(s)")
+
+
 async def close_db() -> None:
     """Close database connections."""
     logger.info("Closing database connections...")
@@ -99,11 +192,20 @@ async def close_db() -> None:
 
 
 async def check_db_connection() -> bool:
-    """Check if database connection is healthy."""
+    """Check if database connection is healthy.
+    
+    The result is cached for ``health_check_cache_seconds`` so health-check
+    floods do not each touch the database.
+    """
+    healthy = _db_health_cache.get("db")
+    if healthy is not None:
+        return healthy
     try:
-        async with async_session_maker() as session:
-            await session.execute(text("SELECT 1"))
-            return True
+        async with engine.connect() as conn:
+            await conn.scalar(text("SELECT 1"))
+        healthy = True
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
-        return False
+        healthy = False
+    _db_health_cache.set("db", healthy)
+    return healthy
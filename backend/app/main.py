@@ -1,16 +1,18 @@
 """FastAPI application entry point."""
 import logging
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from datetime import datetime, timezone
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from starlette.middleware import Middleware
 
+from app.audit_queue import audit_queue
 from app.config import settings
-from app.database import init_db, close_db
+from app.database import init_db, close_db, warm_db_pool, check_db_connection
+from app.middleware.cors import CORSMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.csrf import CSRFMiddleware
 from app.routers import auth, users, vacation_requests, admin, manager, exports, vacation_periods
@@ -30,9 +32,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Starting Vacation Planner application...")
     await init_db()
     logger.info("Database initialized")
+    await warm_db_pool()
+    audit_queue.start()
     yield
     # Shutdown
     logger.info("Shutting down Vacation Planner application...")
+    await audit_queue.stop()
     await close_db()
     logger.info("Database connections closed")
 
@@ -43,31 +48,20 @@ app = FastAPI(
     description="A production-grade vacation planning system with RBAC",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.environment == "development" else None,
     redoc_url="/redoc" if settings.environment == "development" else None,
+    # Listed outermost first; the stack is built once from this list:
+    #   1. RateLimitMiddleware rejects abusive clients before any other work
+    #   2. CORSMiddleware answers preflights and adds CORS headers, including
+    #      to CSRF rejections so the browser can read them
+    #   3. CSRFMiddleware validates Origin/Referer on state-changing requests
     middleware=[
         Middleware(RateLimitMiddleware),
+        Middleware(CORSMiddleware),
         Middleware(CSRFMiddleware),
     ],
 )
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-# Exception handlers
-@app.exception_handler(Exception)
-async def global_exception_handler(request, exc):
-    """Handle uncaught exceptions."""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
-        status_code=500,
-        content={"detail": "An internal error occurred"}
-    )
 
 
 # Include routers with proper prefixes
@@ -77,24 +71,36 @@ app.include_router(vacation_requests.router, prefix="/api/v1")
 app.include_router(admin.router, prefix="/api/v1")
 app.include_router(manager.router, prefix="/api/v1")
 app.include_router(exports.router, prefix="/api/v1")
-app.include_router(vacation_periods.router, prefix="/api/v1")
-app.include_router(vacation_periods.router_allocations, prefix="/api/v1")
-app.include_router(vacation_periods.router_balance, prefix="/api/v1")
+app.include_router(vacation_periods.combined_router, prefix="/api/v1")
+
+
+# Health check bodies, pre-encoded except for the timestamp
+_HEALTHY_BODY = '{"status":"healthy","database":"connected","timestamp":"%s"}'
+_DEGRADED_BODY = '{"status":"degraded","database":"disconnected","timestamp":"%s"}'
+
+# [epoch second, ISO timestamp] - the timestamp is reformatted at most once a second
+_health_timestamp: list = [0, ""]
+
+
+def _health_timestamp_now() -> str:
+    """Get the current UTC time as an ISO string at second resolution."""
+    second = int(time.time())
+    if second != _health_timestamp[0]:
+        _health_timestamp[0] = second
+        _health_timestamp[1] = datetime.fromtimestamp(second, timezone.utc).isoformat()
+    return _health_timestamp[1]
 
 
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint for load balancers and monitoring."""
-    from app.database import check_db_connection
-    
     db_healthy = await check_db_connection()
-    
-    return {
-        "status": "healthy" if db_healthy else "degraded",
-        "database": "connected" if db_healthy else "disconnected",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    }
+    body = _HEALTHY_BODY if db_healthy else _DEGRADED_BODY
+    return Response(
+        content=body % _health_timestamp_now(),
+        media_type="application/json",
+    )
 
 
 @app.get("/", tags=["Root"])
@@ -0,0 +1,68 @@
+"""Helpers shared by the pure ASGI middlewares."""
+import re
+from typing import NamedTuple
+
+import orjson
+
+from starlette.types import Send
+
+
+def compile_origins(origins: tuple[str, ...]) -> re.Pattern:
+    """Compile allowed origins into a single full-match pattern.
+    
+    Exact entries match literally. A trailing ``*`` makes the rest of the
+    entry match as either a prefix or a suffix of the origin.
+    
+    Args:
+        origins: The configured CORS origins.
+        
+    Returns:
+        The compiled pattern.
+    """
+    alternatives = []
+    for origin in origins:
+        if origin.endswith("*"):
+            stem = re.escape(origin.rstrip("*"))
+            alternatives.append(f"{stem}.*|.*{stem}")
+        else:
+            alternatives.append(re.escape(origin))
+    return re.compile("(?:" + "|".join(alternatives) + ")", re.DOTALL)
+
+
+class JSONError(NamedTuple):
+    """A fixed JSON error response, encoded once at import time."""
+    
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+def json_error(status_code: int, detail: str) -> JSONError:
+    """Pre-encode a ``{"detail": ...}`` error response.
+    
+    The body is serialized with orjson, like the app's default response class.
+    
+    Args:
+        status_code: The HTTP status code.
+        detail: The error message.
+        
+    Returns:
+        The encoded status, headers and body.
+    """
+    body = orjson.dumps({"detail": detail})
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+    return JSONError(status_code, headers, body)
+
+
+async def send_json(send: Send, response: JSONError) -> None:
+    """Send a pre-encoded JSON error without building a Response object.
+    
+    Args:
+        send: The ASGI send callable.
+        response: The pre-encoded response.
+    """
+    await send({"type": "http.response.start", "status": response.status_code, "headers": response.headers})
+    await send({"type": "http.response.body", "body": response.body})
@@ -0,0 +1,117 @@
+"""CORS middleware for the configured frontend origins."""
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+
+# Every method and header is allowed; credentials (the refresh cookie) are
+# always allowed, so an accepted origin is echoed back rather than "*"
+_ALL_METHODS = frozenset({b"DELETE", b"GET", b"HEAD", b"OPTIONS", b"PATCH", b"POST", b"PUT"})
+_PREFLIGHT_HEADERS = [
+    (b"vary", b"Origin"),
+    (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+    (b"access-control-max-age", b"600"),
+    (b"access-control-allow-credentials", b"true"),
+    (b"content-type", b"text/plain; charset=utf-8"),
+]
+_ALLOW_CREDENTIALS = (b"access-control-allow-credentials", b"true")
+
+
+# =============================================================================
+# CORS Middleware
+# =============================================================================
+class CORSMiddleware:
+    """Cross-origin resource sharing for the API.
+    
+    Equivalent to Starlette's CORSMiddleware configured with the CORS origins,
+    ``allow_credentials=True`` and all methods and headers. As there, origins
+    match exactly and a bare ``*`` entry allows every origin; the CSRF
+    check's looser wildcard rule does not apply to credentialed reads.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        allowed_origins = tuple(getattr(settings, "cors_origins", ()))
+        self._allow_all_origins = "*" in allowed_origins
+        self._allowed_origins = frozenset(origin.encode("latin-1") for origin in allowed_origins)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answer preflight requests and add CORS headers to responses."""
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        origin = requested_method = requested_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                requested_method = value
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+        
+        # Same-origin and non-browser requests carry no Origin header
+        if origin is None:
+            return await self.app(scope, receive, send)
+        
+        allowed = self._allow_all_origins or origin in self._allowed_origins
+        
+        if scope["method"] == "OPTIONS" and requested_method is not None:
+            return await self._preflight(send, origin, allowed, requested_method, requested_headers)
+        
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = message["headers"] = list(message.get("headers", ()))
+                headers.append(_ALLOW_CREDENTIALS)
+                if allowed:
+                    headers.append((b"access-control-allow-origin", origin))
+                    _add_vary_origin(headers)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+    
+    async def _preflight(
+        self,
+        send: Send,
+        origin: bytes,
+        allowed: bool,
+        requested_method: bytes,
+        requested_headers: Optional[bytes],
+    ) -> None:
+        """Respond to a CORS preflight request.
+        
+        Args:
+            send: The ASGI send callable.
+            origin: The request's Origin header.
+            allowed: Whether the origin is allowed.
+            requested_method: The Access-Control-Request-Method header.
+            requested_headers: The Access-Control-Request-Headers header, if any.
+        """
+        headers = list(_PREFLIGHT_HEADERS)
+        failures = []
+        if allowed:
+            headers.append((b"access-control-allow-origin", origin))
+        else:
+            failures.append("origin")
+        if requested_method not in _ALL_METHODS:
+            failures.append("method")
+        if requested_headers is not None:
+            headers.append((b"access-control-allow-headers", requested_headers))
+        
+        if failures:
+            status_code, body = 400, ("Disallowed CORS " + ", ".join(failures)).encode("utf-8")
+        else:
+            status_code, body = 200, b"OK"
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _add_vary_origin(headers: list[tuple[bytes, bytes]]) -> None:
+    """Add Origin to the response's Vary header, merging with any existing value."""
+    for i, (name, value) in enumerate(headers):
+        if name == b"vary":
+            headers[i] = (name, value + b", Origin")
+            return
+    headers.append((b"vary", b"Origin"))
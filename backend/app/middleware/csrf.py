@@ -1,84 +1,85 @@
 """CSRF protection middleware for API endpoints."""
-from typing import Optional
+import re
 
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.config import settings
+from app.middleware.asgi import compile_origins, json_error, send_json
+
+
+_INVALID_ORIGIN = json_error(status.HTTP_403_FORBIDDEN, "CSRF validation failed: Invalid origin")
+_INVALID_REFERER = json_error(status.HTTP_403_FORBIDDEN, "CSRF validation failed: Invalid referer")
+
+# scheme://netloc prefix of a Referer URL
+_REFERER_ORIGIN = re.compile(r"[^:/?#]+://[^/?#]*")
 
 
 # =============================================================================
 # CSRF Middleware
 # =============================================================================
-class CSRFMiddleware(BaseHTTPMiddleware):
+class CSRFMiddleware:
     """CSRF protection middleware for state-changing requests.
     
     Validates Origin and Referer headers for POST, PUT, DELETE, PATCH requests
-    to prevent cross-site request forgery attacks.
+    to prevent cross-site request forgery attacks. Implemented as plain ASGI
+    middleware so requests are not wrapped in extra tasks and streams.
     """
     
     # Methods that require CSRF validation
-    SENSITIVE_METHODS = {"POST", "PUT", "DELETE", "PATCH"}
+    SENSITIVE_METHODS = frozenset({"POST", "PUT", "DELETE", "PATCH"})
     
     # Paths that don't require CSRF validation (e.g., webhooks, third-party APIs)
-    EXCLUDED_PATHS = {
+    EXCLUDED_PATHS = frozenset({
         "/health",
         "/api/v1/auth/login",
         "/api/v1/auth/refresh",
         "/api/v1/auth/password-reset-request",
         "/api/v1/auth/password-reset-confirm",
-    }
+    })
     
-    def __init__(self, app):
-        super().__init__(app)
-        self._allowed_origins: Optional[list[str]] = None
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        allowed_origins = tuple(getattr(settings, "cors_origins", ()))
+        # All exact and wildcard origins are matched by one compiled pattern
+        self._restrict_origins = bool(allowed_origins)
+        self._origin_matches = compile_origins(allowed_origins).fullmatch
     
-    @property
-    def allowed_origins(self) -> list[str]:
-        """Get allowed CORS origins from settings."""
-        if self._allowed_origins is None:
-            self._allowed_origins = settings.cors_origins if hasattr(settings, 'cors_origins') else []
-        return self._allowed_origins
-    
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Validate CSRF protection for sensitive requests."""
-        # Skip CSRF validation for non-sensitive methods
-        if request.method not in self.SENSITIVE_METHODS:
-            return await call_next(request)
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
         
-        # Skip excluded paths
-        if request.url.path in self.EXCLUDED_PATHS:
-            return await call_next(request)
+        # Skip CSRF validation for non-sensitive methods and excluded paths
+        if scope["method"] not in self.SENSITIVE_METHODS or scope["path"] in self.EXCLUDED_PATHS:
+            return await self.app(scope, receive, send)
         
         # Get origin and referer headers
-        origin = request.headers.get("origin")
-        referer = request.headers.get("referer")
+        origin = referer = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+            elif name == b"referer":
+                referer = value.decode("latin-1")
         
         # For browser requests, we need either Origin or Referer
         # This helps prevent CSRF attacks from malicious sites
         if not origin and not referer:
             # Allow requests without headers (e.g., mobile apps, curl)
             # In production, you might want to be stricter here
-            return await call_next(request)
+            return await self.app(scope, receive, send)
         
         # Validate Origin header if present
         if origin:
             if not self._is_origin_allowed(origin):
-                return JSONResponse(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    content={"detail": "CSRF validation failed: Invalid origin"}
-                )
+                return await send_json(send, _INVALID_ORIGIN)
         
         # Validate Referer header if present
         if referer:
             if not self._is_referer_allowed(referer):
-                return JSONResponse(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    content={"detail": "CSRF validation failed: Invalid referer"}
-                )
+                return await send_json(send, _INVALID_REFERER)
         
-        return await call_next(request)
+        await self.app(scope, receive, send)
     
     def _is_origin_allowed(self, origin: str) -> bool:
         """Check if the origin is allowed.
@@ -89,22 +90,10 @@ class CSRFMiddleware(BaseHTTPMiddleware):
         Returns:
             True if the origin is allowed.
         """
-        if not self.allowed_origins:
+        if not self._restrict_origins:
             # No restrictions configured, allow all
             return True
-        
-        # Exact match
-        if origin in self.allowed_origins:
-            return True
-        
-        # Check for wildcard patterns (e.g., "*.example.com")
-        for allowed in self.allowed_origins:
-            if allowed.endswith("*"):
-                domain = allowed.rstrip("*")
-                if origin.endswith(domain) or origin.startswith(domain):
-                    return True
-        
-        return False
+        return self._origin_matches(origin) is not None
     
     def _is_referer_allowed(self, referer: str) -> bool:
         """Check if the referer is allowed.
@@ -115,28 +104,13 @@ class CSRFMiddleware(BaseHTTPMiddleware):
         Returns:
             True if the referer is allowed.
         """
-        if not self.allowed_origins:
+        if not self._restrict_origins:
             # No restrictions configured, allow all
             return True
         
         # Extract the origin from referer
         # Referer format: https://example.com/path
-        try:
-            from urllib.parse import urlparse
-            referer_origin = f"{urlparse(referer).scheme}://{urlparse(referer).netloc}"
-            
-            if referer_origin in self.allowed_origins:
-                return True
-            
-            # Check for wildcard patterns
-            for allowed in self.allowed_origins:
-                if allowed.endswith("*"):
-                    domain = allowed.rstrip("*")
-                    if referer_origin.endswith(domain) or referer_origin.startswith(domain):
-                        return True
-            
+        referer_origin = _REFERER_ORIGIN.match(referer)
+        if referer_origin is None:
             return False
-        except Exception:
-            # If we can't parse the referer, be strict and allow the request
-            # (it will be validated by Origin if present)
-            return True
+        return self._origin_matches(referer_origin.group(0)) is not None
@@ -1,12 +1,15 @@
 """Rate limiting and account lockout middleware."""
 import asyncio
 import time
-from collections import defaultdict
-from typing import Optional
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.middleware.asgi import json_error, send_json
 
 
 # =============================================================================
@@ -20,12 +23,37 @@ class AccountLockoutStore:
     """
     
     def __init__(self):
-        self._attempts: dict[str, list[float]] = defaultdict(list)
-        self._locked: dict[str, bool] = defaultdict(bool)
+        self._attempts: dict[str, deque[float]] = {}
+        self._locked_until: dict[str, float] = {}
+        # Per-email lock and waiter count; entries are removed when unused
+        self._locks: dict[str, list] = {}
         self._lockout_duration = 900  # 15 minutes in seconds
         self._max_attempts = 5
         self._window_seconds = 900  # 15 minutes window
     
+    @asynccontextmanager
+    async def guard(self, email: str) -> AsyncIterator[None]:
+        """Serialize login attempts for one email.
+        
+        Hold this around check_login and the matching record_failure or
+        record_success so concurrent attempts cannot all pass the check
+        before any failure is recorded.
+        
+        Args:
+            email: The user's email address.
+        """
+        entry = self._locks.get(email)
+        if entry is None:
+            entry = self._locks[email] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[email]
+    
     async def check_login(self, email: str) -> tuple[bool, str]:
         """Check if login is allowed for the email.
         
@@ -38,22 +66,25 @@ class AccountLockoutStore:
         now = time.time()
         window_start = now - self._window_seconds
         
-        # Clean old attempts outside the window
-        self._attempts[email] = [t for t in self._attempts[email] if t > window_start]
+        # Clean old attempts outside the window (attempts are in time order);
+        # emails with no recent failures are dropped from the store
+        attempts = self._attempts.get(email)
+        if attempts is not None:
+            while attempts and attempts[0] <= window_start:
+                attempts.popleft()
+            if not attempts:
+                del self._attempts[email]
         
-        # Check if account is locked
-        if self._locked[email]:
-            remaining = self._lockout_duration - (now - self._attempts[email][-1]) if self._attempts[email] else self._lockout_duration
-            return False, f"Account locked due to too many failed attempts. Try again in {int(remaining)} seconds."
+        # Check if account is locked; expired locks are dropped on access
+        locked_until = self._locked_until.get(email, 0.0)
+        if now < locked_until:
+            return False, f"Account locked due to too many failed attempts. Try again in {int(locked_until - now)} seconds."
+        elif locked_until:
+            del self._locked_until[email]
         
         # Check if we've reached max attempts
-        if len(self._attempts[email]) >= self._max_attempts:
-            self._locked[email] = True
-            # Schedule unlock after lockout duration
-            asyncio.get_event_loop().call_later(
-                self._lockout_duration, 
-                lambda: self._locked.__setitem__(email, False)
-            )
+        if attempts and len(attempts) >= self._max_attempts:
+            self._locked_until[email] = now + self._lockout_duration
             return False, "Account locked due to too many failed attempts. Try again in 15 minutes."
         
         return True, ""
@@ -64,7 +95,10 @@ class AccountLockoutStore:
         Args:
             email: The user's email address.
         """
-        self._attempts[email].append(time.time())
+        attempts = self._attempts.get(email)
+        if attempts is None:
+            attempts = self._attempts[email] = deque()
+        attempts.append(time.time())
     
     def record_success(self, email: str) -> None:
         """Clear failed attempts on successful login.
@@ -72,7 +106,7 @@ class AccountLockoutStore:
         Args:
             email: The user's email address.
         """
-        self._attempts[email] = []
+        self._attempts.pop(email, None)
     
     def is_locked(self, email: str) -> bool:
         """Check if an account is currently locked.
@@ -83,7 +117,7 @@ class AccountLockoutStore:
         Returns:
             True if the account is locked.
         """
-        return self._locked[email]
+        return self._locked_until.get(email, 0.0) > time.time()
 
 
 # Global account lockout store instance
@@ -93,8 +127,21 @@ account_lockout_store = AccountLockoutStore()
 # =============================================================================
 # Rate Limit Middleware
 # =============================================================================
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware for API endpoints."""
+_TOO_MANY_REQUESTS = json_error(status.HTTP_429_TOO_MANY_REQUESTS, "Too many requests. Please try again later.")
+
+# Seconds after which an untouched bucket has fully refilled at any limit
+_BUCKET_IDLE_SECONDS = 60.0
+
+# Paths that are never rate limited
+_UNLIMITED_PATHS = frozenset({"/health", "/docs", "/redoc"})
+
+
+class RateLimitMiddleware:
+    """Rate limiting middleware for API endpoints.
+    
+    Implemented as plain ASGI middleware so requests are not wrapped in
+    extra tasks and streams.
+    """
     
     # Default rate limits by endpoint type
     DEFAULT_LIMITS = {
@@ -103,36 +150,79 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         "/api/v1/auth/password-reset-request": 5,
     }
     
-    def __init__(self, app):
-        super().__init__(app)
-        self._request_counts: dict[str, list[float]] = defaultdict(list)
+    # Maximum number of client buckets kept; least recently seen are evicted
+    MAX_CLIENTS = 10000
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._trust_proxy = settings.trust_proxy
+        # Token bucket per (client, limit): [tokens, last_refill]
+        self._buckets: OrderedDict[tuple[str, int], list[float]] = OrderedDict()
+    
+    def _client_ip(self, scope: Scope) -> str:
+        """Get the address requests are rate limited by.
+        
+        Args:
+            scope: The ASGI connection scope.
+            
+        Returns:
+            The leftmost X-Forwarded-For address when proxies are trusted,
+            otherwise the peer address, or "unknown" if the server gave none.
+        """
+        if self._trust_proxy:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    forwarded = value.split(b",", 1)[0].strip()
+                    if forwarded:
+                        return forwarded.decode("latin-1")
+                    break
+        client = scope.get("client")
+        return client[0] if client else "unknown"
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request through rate limiting."""
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        path = scope["path"]
+        
         # Skip rate limiting for health checks and docs
-        if request.url.path in ["/health", "/docs", "/redoc"]:
-            return await call_next(request)
+        if path in _UNLIMITED_PATHS:
+            return await self.app(scope, receive, send)
         
         # Get rate limit for this endpoint
-        limit = self.DEFAULT_LIMITS.get(request.url.path, 60)  # Default 60/minute
+        limit = self.DEFAULT_LIMITS.get(path, 60)  # Default 60/minute
         
         # Check rate limit
-        now = time.time()
-        window = 60  # 1 minute window
+        now = time.monotonic()
+        key = (self._client_ip(scope), limit)
+        
+        # Buckets idle for a full window have refilled completely and are no
+        # different from a new one; drop them from the least recently used end
+        buckets = self._buckets
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if now - oldest[1] < _BUCKET_IDLE_SECONDS:
+                break
+            buckets.popitem(last=False)
         
-        # Clean old requests
-        self._request_counts[request.client.host] = [
-            t for t in self._request_counts[request.client.host] if t > now - window
-        ]
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(limit), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.MAX_CLIENTS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            # Refill at limit tokens per minute, capped at a full bucket
+            bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * (limit / 60.0))
+            bucket[1] = now
         
         # Check if over limit
-        if len(self._request_counts[request.client.host]) >= limit:
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"detail": "Too many requests. Please try again later."}
-            )
+        if bucket[0] < 1.0:
+            return await send_json(send, _TOO_MANY_REQUESTS)
         
         # Record this request
-        self._request_counts[request.client.host].append(now)
+        bucket[0] -= 1.0
         
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -0,0 +1,37 @@
+"""Add composite (filter, created_at) indexes on audit_logs.
+
+Audit log listings filter by actor or resource and order by created_at, so
+the filter columns and the sort key share one index. The composite indexes
+replace the single-purpose actor and resource indexes they extend.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15 09:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace the actor/resource indexes with created_at composites."""
+    op.execute('DROP INDEX IF EXISTS idx_audit_actor')
+    op.execute('DROP INDEX IF EXISTS idx_audit_resource')
+    
+    op.create_index('idx_audit_actor_created', 'audit_logs', ['actor_id', 'created_at'])
+    op.create_index('idx_audit_resource_created', 'audit_logs', ['resource_type', 'resource_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Restore the single-purpose actor/resource indexes."""
+    op.drop_index('idx_audit_resource_created', table_name='audit_logs')
+    op.drop_index('idx_audit_actor_created', table_name='audit_logs')
+    
+    op.create_index('idx_audit_actor', 'audit_logs', ['actor_id'])
+    op.create_index('idx_audit_resource', 'audit_logs', ['resource_type', 'resource_id'])
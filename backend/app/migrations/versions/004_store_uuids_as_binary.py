@@ -0,0 +1,97 @@
+"""Store UUID keys as 16-byte binary (native uuid on PostgreSQL).
+
+Every primary and foreign key was stored as 36-character text. On SQLite
+the values are rewritten in place as 16-byte blobs (column affinity does
+not need to change for that); on PostgreSQL the columns are converted to
+the native uuid type, with foreign keys dropped and recreated around the
+conversion.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15 12:00:00.000000
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+# Every UUID-valued column, by table
+UUID_COLUMNS = {
+    'companies': ['id'],
+    'functions': ['id', 'company_id'],
+    'teams': ['id', 'company_id'],
+    'vacation_periods': ['id', 'company_id'],
+    'users': ['id', 'company_id', 'function_id'],
+    'audit_logs': ['id', 'actor_id', 'resource_id'],
+    'invite_tokens': ['id', 'user_id', 'created_by'],
+    'password_reset_tokens': ['id', 'user_id'],
+    'refresh_tokens': ['id', 'user_id'],
+    'team_manager_assignments': ['id', 'user_id', 'team_id'],
+    'team_memberships': ['id', 'user_id', 'team_id'],
+    'vacation_allocations': ['id', 'user_id', 'vacation_period_id'],
+    'vacation_requests': ['id', 'user_id', 'team_id', 'vacation_period_id', 'approver_id'],
+}
+
+
+def _rewrite_sqlite(connection, stored_type: str, convert) -> None:
+    """Rewrite every UUID value of the given SQLite storage type."""
+    # Parents and children are rewritten one table at a time
+    connection.execute(sa.text('PRAGMA defer_foreign_keys = ON'))
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            rows = connection.execute(sa.text(
+                f'SELECT rowid, {column} FROM {table} WHERE typeof({column}) = :stored_type'
+            ), {'stored_type': stored_type}).all()
+            if rows:
+                connection.execute(
+                    sa.text(f'UPDATE {table} SET {column} = :value WHERE rowid = :row_id'),
+                    [{'value': convert(value), 'row_id': row_id} for row_id, value in rows],
+                )
+
+
+def _alter_postgresql(connection, column_type: str, cast: str) -> None:
+    """Change every UUID column's type, dropping and recreating foreign keys."""
+    inspector = sa.inspect(connection)
+    foreign_keys = {table: inspector.get_foreign_keys(table) for table in UUID_COLUMNS}
+    
+    for table, keys in foreign_keys.items():
+        for key in keys:
+            op.drop_constraint(key['name'], table, type_='foreignkey')
+    
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {column_type} USING {column}::{cast}')
+    
+    for table, keys in foreign_keys.items():
+        for key in keys:
+            op.create_foreign_key(
+                key['name'], table, key['referred_table'],
+                key['constrained_columns'], key['referred_columns'],
+                ondelete=key.get('options', {}).get('ondelete'),
+            )
+
+
+def upgrade() -> None:
+    """Convert UUID keys from text to binary/native uuid."""
+    connection = op.get_bind()
+    if connection.dialect.name == 'postgresql':
+        _alter_postgresql(connection, 'uuid', 'uuid')
+    else:
+        _rewrite_sqlite(connection, 'text', lambda value: uuid.UUID(value).bytes)
+
+
+def downgrade() -> None:
+    """Convert UUID keys back to 36-character text."""
+    connection = op.get_bind()
+    if connection.dialect.name == 'postgresql':
+        _alter_postgresql(connection, 'varchar(36)', 'text')
+    else:
+        _rewrite_sqlite(connection, 'blob', lambda value: str(uuid.UUID(bytes=value)))
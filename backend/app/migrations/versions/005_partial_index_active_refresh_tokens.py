@@ -0,0 +1,52 @@
+"""Index only live refresh tokens by user.
+
+Refresh tokens are looked up by user only when revoking the live ones, and
+revoked rows accumulate forever. A partial index on user_id restricted to
+unrevoked tokens replaces the full user_id index. On PostgreSQL the index is
+built CONCURRENTLY so the table stays writable.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE = sa.text('revoked_at IS NULL')
+
+
+def upgrade() -> None:
+    """Replace the user_id index with a partial index on unrevoked tokens."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'idx_refresh_tokens_user_active', 'refresh_tokens', ['user_id'],
+                postgresql_where=ACTIVE, postgresql_concurrently=True,
+            )
+            op.drop_index(
+                'idx_refresh_tokens_user', table_name='refresh_tokens',
+                postgresql_concurrently=True,
+            )
+        return
+
+    op.create_index(
+        'idx_refresh_tokens_user_active', 'refresh_tokens', ['user_id'],
+        sqlite_where=ACTIVE,
+    )
+    op.drop_index('idx_refresh_tokens_user', table_name='refresh_tokens')
+
+
+def downgrade() -> None:
+    """Restore the full user_id index."""
+    op.create_index('idx_refresh_tokens_user', 'refresh_tokens', ['user_id'])
+    op.drop_index('idx_refresh_tokens_user_active', table_name='refresh_tokens')
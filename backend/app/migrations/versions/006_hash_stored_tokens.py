@@ -0,0 +1,96 @@
+"""Store one-time tokens as hashes and refresh token ids as binary UUIDs.
+
+Invite and password reset tokens were stored in plaintext as String(255);
+they are replaced by a 32-byte BLAKE2b digest in token_hash, so a database
+leak no longer exposes usable tokens and the unique indexes hold fixed-width
+keys. refresh_tokens.token_jti always holds a UUID and is converted to the
+same 16-byte/native uuid storage as the other UUID columns.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-15 15:00:00.000000
+"""
+import hashlib
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+# Token table -> its unique token index
+TOKEN_TABLES = {
+    'invite_tokens': 'idx_invite_token',
+    'password_reset_tokens': 'idx_pw_reset_token',
+}
+
+
+def _hash_token(token: str) -> bytes:
+    """Hash a token the same way as app.models.hash_token."""
+    return hashlib.blake2b(token.encode(), digest_size=32).digest()
+
+
+def upgrade() -> None:
+    """Hash stored tokens and convert refresh token ids to binary UUIDs."""
+    connection = op.get_bind()
+
+    for table, index in TOKEN_TABLES.items():
+        op.add_column(table, sa.Column('token_hash', sa.LargeBinary(32), nullable=True))
+        rows = connection.execute(sa.text(f'SELECT id, token FROM {table}')).all()
+        if rows:
+            connection.execute(
+                sa.text(f'UPDATE {table} SET token_hash = :token_hash WHERE id = :row_id'),
+                [{'token_hash': _hash_token(token), 'row_id': row_id} for row_id, token in rows],
+            )
+        op.drop_index(index, table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('token')
+            batch_op.alter_column('token_hash', nullable=False)
+        op.create_index(index, table, ['token_hash'], unique=True)
+
+    if connection.dialect.name == 'postgresql':
+        op.execute('ALTER TABLE refresh_tokens ALTER COLUMN token_jti TYPE uuid USING token_jti::uuid')
+    else:
+        rows = connection.execute(sa.text(
+            "SELECT rowid, token_jti FROM refresh_tokens WHERE typeof(token_jti) = 'text'"
+        )).all()
+        if rows:
+            connection.execute(
+                sa.text('UPDATE refresh_tokens SET token_jti = :value WHERE rowid = :row_id'),
+                [{'value': uuid.UUID(value).bytes, 'row_id': row_id} for row_id, value in rows],
+            )
+
+
+def downgrade() -> None:
+    """Restore text refresh token ids and plaintext token columns.
+
+    Hashes cannot be reversed, so outstanding invite and password reset
+    tokens are deleted and have to be reissued.
+    """
+    connection = op.get_bind()
+
+    if connection.dialect.name == 'postgresql':
+        op.execute('ALTER TABLE refresh_tokens ALTER COLUMN token_jti TYPE varchar(255) USING token_jti::text')
+    else:
+        rows = connection.execute(sa.text(
+            "SELECT rowid, token_jti FROM refresh_tokens WHERE typeof(token_jti) = 'blob'"
+        )).all()
+        if rows:
+            connection.execute(
+                sa.text('UPDATE refresh_tokens SET token_jti = :value WHERE rowid = :row_id'),
+                [{'value': str(uuid.UUID(bytes=value)), 'row_id': row_id} for row_id, value in rows],
+            )
+
+    for table, index in TOKEN_TABLES.items():
+        op.execute(f'DELETE FROM {table}')
+        op.drop_index(index, table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('token_hash')
+            batch_op.add_column(sa.Column('token', sa.String(255), nullable=False))
+        op.create_index(index, table, ['token'], unique=True)
@@ -0,0 +1,82 @@
+"""Store role, status and audit action enums as SMALLINT codes.
+
+The columns held the enum member names as VARCHAR (native enum types on
+PostgreSQL). Each member is now stored as its declaration ordinal, which
+keeps the rows and the idx_users_role, idx_vr_status and idx_audit_action
+indexes at two bytes per entry.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-15 16:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, PostgreSQL enum type, member names in code order)
+ENUM_COLUMNS = [
+    ('users', 'role', 'userrole', ['ADMIN', 'MANAGER', 'USER']),
+    ('vacation_requests', 'status', 'vacationstatus', ['PENDING', 'APPROVED', 'REJECTED', 'CANCELLED']),
+    ('audit_logs', 'action', 'auditaction', [
+        'USER_CREATED', 'USER_UPDATED', 'USER_DEACTIVATED', 'USER_PASSWORD_RESET',
+        'TEAM_CREATED', 'TEAM_UPDATED', 'TEAM_DELETED',
+        'MANAGER_ASSIGNED', 'MANAGER_REMOVED',
+        'VACATION_REQUEST_APPROVED', 'VACATION_REQUEST_REJECTED',
+        'VACATION_REQUEST_MODIFIED', 'VACATION_REQUEST_CANCELLED',
+    ]),
+]
+
+
+def _name_to_code(column: str, names: list[str]) -> str:
+    """Build a CASE expression mapping member names to codes."""
+    whens = ' '.join(f"WHEN '{name}' THEN {code}" for code, name in enumerate(names))
+    return f'CASE {column} {whens} END'
+
+
+def _code_to_name(column: str, names: list[str]) -> str:
+    """Build a CASE expression mapping codes to member names."""
+    whens = ' '.join(f"WHEN {code} THEN '{name}'" for code, name in enumerate(names))
+    return f'CASE CAST({column} AS INTEGER) {whens} END'
+
+
+def upgrade() -> None:
+    """Convert enum name columns to SMALLINT codes."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    for table, column, enum_type, names in ENUM_COLUMNS:
+        if is_postgresql:
+            op.execute(
+                f'ALTER TABLE {table} ALTER COLUMN {column} TYPE smallint '
+                f'USING {_name_to_code(f"{column}::text", names)}'
+            )
+            op.execute(f'DROP TYPE IF EXISTS {enum_type}')
+        else:
+            op.execute(f'UPDATE {table} SET {column} = {_name_to_code(column, names)}')
+            # Rebuild with INTEGER affinity so the codes are stored as numbers
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.alter_column(column, type_=sa.SmallInteger(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Convert SMALLINT codes back to enum names."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    for table, column, enum_type, names in ENUM_COLUMNS:
+        if is_postgresql:
+            sa.Enum(*names, name=enum_type).create(op.get_bind())
+            op.execute(
+                f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {enum_type} '
+                f'USING ({_code_to_name(column, names)})::{enum_type}'
+            )
+        else:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.alter_column(
+                    column, type_=sa.String(max(len(name) for name in names)), existing_nullable=False
+                )
+            op.execute(f'UPDATE {table} SET {column} = {_code_to_name(column, names)}')
@@ -0,0 +1,32 @@
+"""Drop indexes that duplicate column unique constraints.
+
+users.email and companies.name are declared unique on the column, which
+already creates a unique index; idx_users_email and idx_companies_name
+indexed the same column a second time and doubled the index writes. The
+token tables already carry a single unique index since revision 006.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-15 17:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Drop the duplicate email and company name indexes."""
+    op.execute('DROP INDEX IF EXISTS idx_users_email')
+    op.execute('DROP INDEX IF EXISTS idx_companies_name')
+
+
+def downgrade() -> None:
+    """Restore the duplicate email and company name indexes."""
+    op.create_index('idx_companies_name', 'companies', ['name'])
+    op.create_index('idx_users_email', 'users', ['email'], unique=True)
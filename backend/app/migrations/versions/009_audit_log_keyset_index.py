@@ -0,0 +1,31 @@
+"""Extend the audit log created_at index with the id tiebreaker.
+
+Audit log listings page by (created_at, id) instead of OFFSET, so the
+created_at index gains id as a second column and serves the keyset
+comparison and the ordering on its own.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-15 18:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace idx_audit_created with a (created_at, id) index."""
+    op.create_index('idx_audit_created_id', 'audit_logs', ['created_at', 'id'])
+    op.execute('DROP INDEX IF EXISTS idx_audit_created')
+
+
+def downgrade() -> None:
+    """Restore the single-column created_at index."""
+    op.create_index('idx_audit_created', 'audit_logs', ['created_at'])
+    op.drop_index('idx_audit_created_id', table_name='audit_logs')
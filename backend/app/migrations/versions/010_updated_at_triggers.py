@@ -0,0 +1,71 @@
+"""Maintain updated_at with database triggers.
+
+updated_at was set by an onupdate clause the ORM appended to every UPDATE.
+A per-table trigger now sets it, so application UPDATEs carry only the
+columns they change. An UPDATE that sets updated_at explicitly keeps its
+value.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-15 19:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+TABLES = [
+    'companies',
+    'functions',
+    'teams',
+    'vacation_periods',
+    'vacation_allocations',
+    'users',
+    'vacation_requests',
+]
+
+
+def upgrade() -> None:
+    """Create the updated_at triggers."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+            BEGIN
+                IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+                    NEW.updated_at = now();
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        for table in TABLES:
+            op.execute(
+                f'CREATE TRIGGER trg_{table}_updated_at BEFORE UPDATE ON {table} '
+                f'FOR EACH ROW EXECUTE FUNCTION set_updated_at()'
+            )
+        return
+
+    for table in TABLES:
+        op.execute(
+            f'CREATE TRIGGER trg_{table}_updated_at AFTER UPDATE ON {table} '
+            f'FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN '
+            f'UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END'
+        )
+
+
+def downgrade() -> None:
+    """Drop the updated_at triggers."""
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    for table in TABLES:
+        if is_postgresql:
+            op.execute(f'DROP TRIGGER IF EXISTS trg_{table}_updated_at ON {table}')
+        else:
+            op.execute(f'DROP TRIGGER IF EXISTS trg_{table}_updated_at')
+    if is_postgresql:
+        op.execute('DROP FUNCTION IF EXISTS set_updated_at()')
@@ -0,0 +1,28 @@
+"""Index users by (created_at, id) for keyset pagination.
+
+The admin user list pages by (created_at, id) instead of OFFSET; the
+composite index serves both the keyset comparison and the ordering.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-15 20:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the (created_at, id) index on users."""
+    op.create_index('idx_users_created_id', 'users', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Drop the (created_at, id) index on users."""
+    op.drop_index('idx_users_created_id', table_name='users')
@@ -1,13 +1,20 @@
 """SQLAlchemy models for the Vacation Planner application."""
+import hashlib
+import os
+import time
 import uuid
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
 from sqlalchemy import (
-    String, Text, DateTime, Date, ForeignKey, Integer, Enum as SQLEnum, 
-    Boolean, Index, UniqueConstraint, JSON, func, TypeDecorator, Float
+    String, Text, DateTime, Date, ForeignKey, Integer, SmallInteger, 
+    Boolean, Index, UniqueConstraint, JSON, func, TypeDecorator, Float, BINARY, LargeBinary, text,
+    DDL, FetchedValue, event
 )
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -45,23 +52,138 @@ class AuditAction(str, Enum):
     VACATION_REQUEST_CANCELLED = "vacation_request_cancelled"
 
 
-# Custom UUID type that stores as string for SQLite compatibility
-class StringUUID(TypeDecorator):
-    """Custom type for storing UUIDs as strings (SQLite compatible)."""
-    impl = String(36)
+# Roles with manager rights (admins manage every team)
+_MANAGER_ROLES = frozenset({UserRole.ADMIN, UserRole.MANAGER})
+
+def uuid7() -> uuid.UUID:
+    """Generate a time-ordered UUIDv7 (RFC 9562).
+    
+    The leading 48 bits are the Unix time in milliseconds and the remaining
+    74 non-version bits are random, so new primary keys land at the end of
+    their index instead of on a random page.
+    
+    Returns:
+        A new version 7 UUID.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                              # version
+        | (rand >> 68) << 64                     # rand_a, 12 bits
+        | 0b10 << 62                             # variant
+        | rand & 0x3FFF_FFFF_FFFF_FFFF           # rand_b, 62 bits
+    )
+    return uuid.UUID(int=value)
+
+
+def hash_token(token: str) -> bytes:
+    """Hash a one-time token for storage and lookup.
+    
+    Only the 32-byte digest is stored, so a database leak does not expose
+    usable tokens and the unique indexes hold fixed-width keys.
+    
+    Args:
+        token: The plaintext token.
+        
+    Returns:
+        The BLAKE2b-256 digest of the token.
+    """
+    return hashlib.blake2b(token.encode(), digest_size=32).digest()
+
+
+class _HashedTokenMixin:
+    """Accepts a plaintext ``token`` and stores only its hash.
+    
+    The plaintext stays on the instance that issued it so the caller can
+    hand it out; instances loaded from the database only have the hash.
+    """
+    token = None
+    
+    def __init__(self, token: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        if token is not None:
+            self.token = token
+            self.token_hash = hash_token(token)
+
+
+def _utcnow() -> datetime:
+    """Return the current time in UTC."""
+    return datetime.now(timezone.utc)
+
+
+@lru_cache(maxsize=8192)
+def _uuid_from_bytes(value: bytes) -> uuid.UUID:
+    """Build a UUID from its 16-byte form.
+    
+    Parsed UUIDs are immutable, so repeated keys (company, team and user ids
+    appear on most rows) are built once and shared.
+    """
+    return uuid.UUID(bytes=value)
+
+
+# Custom UUID type: native uuid on PostgreSQL, 16 raw bytes elsewhere
+class BinaryUUID(TypeDecorator):
+    """Custom type for storing UUIDs compactly.
+    
+    Uses the native UUID type on PostgreSQL and a 16-byte BINARY/BLOB on
+    other databases, less than half the size of the 36-character text form
+    in both rows and indexes.
+    """
+    impl = BINARY(16)
     cache_ok = True
     
+    def load_dialect_impl(self, dialect):
+        """Use the native UUID column type where the database has one."""
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(BINARY(16))
+    
     def process_bind_param(self, value, dialect):
-        """Convert UUID to string for storage."""
+        """Convert UUID (or its string form) to the stored representation."""
         if value is None:
             return None
-        return str(value)
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        if dialect.name == "postgresql":
+            return value
+        return value.bytes
     
     def process_result_value(self, value, dialect):
-        """Convert string back to UUID."""
+        """Convert the stored representation back to UUID."""
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return _uuid_from_bytes(bytes(value))
+
+
+# Custom enum type: members stored as their declaration ordinal
+class SmallIntEnum(TypeDecorator):
+    """Custom type for storing enum members as SMALLINT codes.
+    
+    Each member is stored as its position in the enum's declaration order,
+    two bytes per row and index entry instead of the member name. New
+    members must therefore only be appended, never inserted or reordered.
+    """
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class: type[Enum]):
+        super().__init__()
+        self.enum_class = enum_class
+        self._members = tuple(enum_class)
+        self._codes = {member: code for code, member in enumerate(self._members)}
+    
+    def process_bind_param(self, value, dialect):
+        """Convert an enum member (or its value) to its code."""
         if value is None:
             return None
-        return uuid.UUID(value)
+        return self._codes[self.enum_class(value)]
+    
+    def process_result_value(self, value, dialect):
+        """Convert a stored code back to the enum member."""
+        if value is None:
+            return None
+        return self._members[int(value)]
 
 
 # =============================================================================
@@ -71,10 +193,10 @@ class Company(Base):
     """Company model for multi-tenant isolation."""
     __tablename__ = "companies"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
     name: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
     # Relationships
     functions: Mapped[list["Function"]] = relationship("Function", back_populates="company", cascade="all, delete-orphan")
@@ -82,8 +204,8 @@ class Company(Base):
     users: Mapped[list["User"]] = relationship("User", back_populates="company")
     vacation_periods: Mapped[list["VacationPeriod"]] = relationship("VacationPeriod", back_populates="company", cascade="all, delete-orphan")
     
-    # Indexes
-    __table_args__ = (Index("idx_companies_name", "name"),)
+    # Fetch created_at/updated_at with the INSERT (RETURNING) instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
 
 # =============================================================================
@@ -93,11 +215,11 @@ class Function(Base):
     """Function/department model."""
     __tablename__ = "functions"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    company_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    company_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
     # Relationships
     company: Mapped["Company"] = relationship("Company", back_populates="functions")
@@ -105,6 +227,9 @@ class Function(Base):
     
     # Indexes
     __table_args__ = (Index("idx_functions_company_name", "company_id", "name"),)
+    
+    # Fetch created_at/updated_at with the INSERT (RETURNING) instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
 
 # =============================================================================
@@ -114,11 +239,11 @@ class Team(Base):
     """Team model for grouping users within a company."""
     __tablename__ = "teams"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    company_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    company_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
     # Relationships
     company: Mapped["Company"] = relationship("Company", back_populates="teams")
@@ -128,6 +253,9 @@ class Team(Base):
     
     # Indexes
     __table_args__ = (Index("idx_teams_company_name", "company_id", "name"),)
+    
+    # Fetch created_at/updated_at with the INSERT (RETURNING) instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
 
 # =============================================================================
@@ -137,14 +265,14 @@ class VacationPeriod(Base):
     """Company-level vacation year configuration."""
     __tablename__ = "vacation_periods"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    company_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    company_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String(100), nullable=False)  # e.g., "2024-2025"
     start_date: Mapped[date] = mapped_column(Date, nullable=False)  # e.g., April 1
     end_date: Mapped[date] = mapped_column(Date, nullable=False)    # e.g., March 31
     is_default: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
     # Relationships
     company: Mapped["Company"] = relationship("Company", back_populates="vacation_periods")
@@ -156,6 +284,9 @@ class VacationPeriod(Base):
         Index("idx_vacation_periods_company", "company_id"),
         Index("idx_vacation_periods_dates", "company_id", "start_date", "end_date"),
     )
+    
+    # Fetch created_at/updated_at with the INSERT (RETURNING) instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
 
 # =============================================================================
@@ -165,14 +296,14 @@ class VacationAllocation(Base):
     """Per-user, per-period vacation day tracking."""
     __tablename__ = "vacation_allocations"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    vacation_period_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("vacation_periods.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    user_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    vacation_period_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("vacation_periods.id", ondelete="CASCADE"), nullable=False)
     total_days: Mapped[float] = mapped_column(Float, default=25.0)
     carried_over_days: Mapped[float] = mapped_column(Float, default=0.0)
     days_used: Mapped[float] = mapped_column(Float, default=0.0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="vacation_allocations")
@@ -189,6 +320,9 @@ class VacationAllocation(Base):
     def remaining_days(self) -> float:
         """Calculate remaining vacation days."""
         return self.total_days + self.carried_over_days - self.days_used
+    
+    # Fetch created_at/updated_at with the INSERT (RETURNING) instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
 
 # =============================================================================
@@ -198,50 +332,59 @@ class User(Base):
     """User model for authentication and authorization."""
     __tablename__ = "users"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     hashed_password: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)  # Nullable until password set via invite
     first_name: Mapped[str] = mapped_column(String(100), nullable=False)
     last_name: Mapped[str] = mapped_column(String(100), nullable=False)
-    role: Mapped[UserRole] = mapped_column(SQLEnum(UserRole), default=UserRole.USER, nullable=False)
-    company_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
-    function_id: Mapped[Optional[uuid.UUID]] = mapped_column(StringUUID, ForeignKey("functions.id", ondelete="SET NULL"), nullable=True)
+    role: Mapped[UserRole] = mapped_column(SmallIntEnum(UserRole), default=UserRole.USER, nullable=False)
+    company_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    function_id: Mapped[Optional[uuid.UUID]] = mapped_column(BinaryUUID, ForeignKey("functions.id", ondelete="SET NULL"), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=False)  # False until password set
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_utcnow, server_default=func.now()
+    )  # Microsecond precision on every backend; keyset pagination compares it
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
-    # Relationships
+    # Relationships; collections are never loaded implicitly (routes that need
+    # one use selectinload) and child rows are removed by ON DELETE rules
     company: Mapped["Company"] = relationship("Company", back_populates="users")
     function: Mapped[Optional["Function"]] = relationship("Function", back_populates="users")
-    memberships: Mapped[list["TeamMembership"]] = relationship("TeamMembership", back_populates="user", cascade="all, delete-orphan")
-    manager_assignments: Mapped[list["TeamManagerAssignment"]] = relationship("TeamManagerAssignment", back_populates="user", cascade="all, delete-orphan")
-    vacation_requests: Mapped[list["VacationRequest"]] = relationship("VacationRequest", back_populates="user", foreign_keys="VacationRequest.user_id")
-    approved_requests: Mapped[list["VacationRequest"]] = relationship("VacationRequest", back_populates="approver", foreign_keys="VacationRequest.approver_id")
-    audit_logs: Mapped[list["AuditLog"]] = relationship("AuditLog", back_populates="actor")
-    invite_tokens: Mapped[list["InviteToken"]] = relationship("InviteToken", back_populates="user", cascade="all, delete-orphan", foreign_keys="InviteToken.user_id")
-    password_reset_tokens: Mapped[list["PasswordResetToken"]] = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan")
-    refresh_tokens: Mapped[list["RefreshToken"]] = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
-    vacation_allocations: Mapped[list["VacationAllocation"]] = relationship("VacationAllocation", back_populates="user", cascade="all, delete-orphan")
+    memberships: Mapped[list["TeamMembership"]] = relationship("TeamMembership", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    manager_assignments: Mapped[list["TeamManagerAssignment"]] = relationship("TeamManagerAssignment", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    vacation_requests: Mapped[list["VacationRequest"]] = relationship("VacationRequest", back_populates="user", foreign_keys="VacationRequest.user_id", lazy="raise", passive_deletes=True)
+    approved_requests: Mapped[list["VacationRequest"]] = relationship("VacationRequest", back_populates="approver", foreign_keys="VacationRequest.approver_id", lazy="raise", passive_deletes=True)
+    audit_logs: Mapped[list["AuditLog"]] = relationship("AuditLog", back_populates="actor", lazy="raise", passive_deletes=True)
+    invite_tokens: Mapped[list["InviteToken"]] = relationship("InviteToken", back_populates="user", cascade="all, delete-orphan", foreign_keys="InviteToken.user_id", lazy="raise", passive_deletes=True)
+    password_reset_tokens: Mapped[list["PasswordResetToken"]] = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    refresh_tokens: Mapped[list["RefreshToken"]] = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    vacation_allocations: Mapped[list["VacationAllocation"]] = relationship("VacationAllocation", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
     
     # Indexes
     __table_args__ = (
-        Index("idx_users_email", "email", unique=True),
         Index("idx_users_company", "company_id"),
         Index("idx_users_role", "role"),
+        Index("idx_users_created_id", "created_at", "id"),
     )
     
-    @property
+    @hybrid_property
     def full_name(self) -> str:
         """Return user's full name."""
         return f"{self.first_name} {self.last_name}"
     
+    @full_name.inplace.expression
+    @classmethod
+    def _full_name_expression(cls):
+        """Build the full name in SQL for filtering and ordering."""
+        return cls.first_name + " " + cls.last_name
+    
     def is_admin(self) -> bool:
         """Check if user is an admin."""
         return self.role == UserRole.ADMIN
     
     def is_manager(self) -> bool:
         """Check if user is a manager."""
-        return self.role in (UserRole.ADMIN, UserRole.MANAGER)
+        return self.role in _MANAGER_ROLES
 
 
 # =============================================================================
@@ -251,9 +394,9 @@ class TeamMembership(Base):
     """Team membership junction table."""
     __tablename__ = "team_memberships"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    team_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    user_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    team_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
     joined_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -271,9 +414,9 @@ class TeamManagerAssignment(Base):
     """Team manager assignment junction table."""
     __tablename__ = "team_manager_assignments"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    team_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    user_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    team_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
     assigned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -291,20 +434,20 @@ class VacationRequest(Base):
     """Vacation request model."""
     __tablename__ = "vacation_requests"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    team_id: Mapped[Optional[uuid.UUID]] = mapped_column(StringUUID, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True)
-    vacation_period_id: Mapped[Optional[uuid.UUID]] = mapped_column(StringUUID, ForeignKey("vacation_periods.id", ondelete="SET NULL"), nullable=True)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    user_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    team_id: Mapped[Optional[uuid.UUID]] = mapped_column(BinaryUUID, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True)
+    vacation_period_id: Mapped[Optional[uuid.UUID]] = mapped_column(BinaryUUID, ForeignKey("vacation_periods.id", ondelete="SET NULL"), nullable=True)
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
     end_date: Mapped[date] = mapped_column(Date, nullable=False)
     vacation_type: Mapped[str] = mapped_column(String(50), default="annual")  # annual, sick, personal, etc.
     days_count: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Calculated business days
-    status: Mapped[VacationStatus] = mapped_column(SQLEnum(VacationStatus), default=VacationStatus.PENDING, nullable=False)
+    status: Mapped[VacationStatus] = mapped_column(SmallIntEnum(VacationStatus), default=VacationStatus.PENDING, nullable=False)
     reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    approver_id: Mapped[Optional[uuid.UUID]] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    approver_id: Mapped[Optional[uuid.UUID]] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     approved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="vacation_requests", foreign_keys=[user_id])
@@ -344,40 +487,45 @@ class AuditLog(Base):
     """Audit log model for tracking admin/manager actions."""
     __tablename__ = "audit_logs"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    actor_id: Mapped[Optional[uuid.UUID]] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    action: Mapped[AuditAction] = mapped_column(SQLEnum(AuditAction), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    actor_id: Mapped[Optional[uuid.UUID]] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    action: Mapped[AuditAction] = mapped_column(SmallIntEnum(AuditAction), nullable=False)
     resource_type: Mapped[str] = mapped_column(String(100), nullable=False)  # e.g., "user", "team", "vacation_request"
-    resource_id: Mapped[Optional[uuid.UUID]] = mapped_column(StringUUID, nullable=True)
+    resource_id: Mapped[Optional[uuid.UUID]] = mapped_column(BinaryUUID, nullable=True)
     details: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # Additional context
     ip_address: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)  # IPv4 or IPv6
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_utcnow, server_default=func.now()
+    )  # Microsecond precision on every backend; keyset pagination compares it
     
     # Relationships
     actor: Mapped[Optional["User"]] = relationship("User", back_populates="audit_logs")
     
+    # Fetch created_at with the INSERT (RETURNING) instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    
     # Indexes
     __table_args__ = (
-        Index("idx_audit_actor", "actor_id"),
+        Index("idx_audit_actor_created", "actor_id", "created_at"),
         Index("idx_audit_action", "action"),
-        Index("idx_audit_resource", "resource_type", "resource_id"),
-        Index("idx_audit_created", "created_at"),
+        Index("idx_audit_resource_created", "resource_type", "resource_id", "created_at"),
+        Index("idx_audit_created_id", "created_at", "id"),
     )
 
 
 # =============================================================================
 # Invite Token Model - for invite/set-password flow
 # =============================================================================
-class InviteToken(Base):
+class InviteToken(_HashedTokenMixin, Base):
     """Invite token model for invite/set-password flow."""
     __tablename__ = "invite_tokens"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    token: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
-    user_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     used_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
-    created_by: Mapped[Optional[uuid.UUID]] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_by: Mapped[Optional[uuid.UUID]] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -385,19 +533,19 @@ class InviteToken(Base):
     creator: Mapped[Optional["User"]] = relationship("User", foreign_keys=[created_by])
     
     # Indexes
-    __table_args__ = (Index("idx_invite_token", "token", unique=True),)
+    __table_args__ = (Index("idx_invite_token", "token_hash", unique=True),)
 
 
 # =============================================================================
 # Password Reset Token Model
 # =============================================================================
-class PasswordResetToken(Base):
+class PasswordResetToken(_HashedTokenMixin, Base):
     """Password reset token model."""
     __tablename__ = "password_reset_tokens"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    token: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
-    user_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     used_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -406,7 +554,7 @@ class PasswordResetToken(Base):
     user: Mapped["User"] = relationship("User", back_populates="password_reset_tokens")
     
     # Indexes
-    __table_args__ = (Index("idx_pw_reset_token", "token", unique=True),)
+    __table_args__ = (Index("idx_pw_reset_token", "token_hash", unique=True),)
 
 
 # =============================================================================
@@ -420,9 +568,9 @@ class RefreshToken(Base):
     """
     __tablename__ = "refresh_tokens"
     
-    id: Mapped[uuid.UUID] = mapped_column(StringUUID, primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(StringUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token_jti: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)  # JWT ID for rotation tracking
+    id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, primary_key=True, default=uuid7)
+    user_id: Mapped[uuid.UUID] = mapped_column(BinaryUUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token_jti: Mapped[uuid.UUID] = mapped_column(BinaryUUID, nullable=False)  # JWT ID for rotation tracking
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -432,7 +580,13 @@ class RefreshToken(Base):
     
     # Indexes
     __table_args__ = (
-        Index("idx_refresh_tokens_user", "user_id"),
+        # Only live tokens are looked up by user (rotation, revoke-all), so
+        # revoked rows are kept out of the index
+        Index(
+            "idx_refresh_tokens_user_active", "user_id",
+            postgresql_where=text("revoked_at IS NULL"),
+            sqlite_where=text("revoked_at IS NULL"),
+        ),
         Index("idx_refresh_tokens_jti", "token_jti", unique=True),
         Index("idx_refresh_tokens_expires", "expires_at"),
     )
@@ -444,5 +598,47 @@ class RefreshToken(Base):
     
     @property
     def is_expired(self) -> bool:
-        """Check if the token has expired."""
+        """Check if the token has expired.
+        
+        Request paths filter on ``expires_at`` in SQL instead of loading tokens.
+        """
         return datetime.now(timezone.utc) > self.expires_at
+
+
+# =============================================================================
+# updated_at triggers
+# =============================================================================
+# updated_at is maintained by the database, so ORM UPDATEs carry only the
+# changed columns. An UPDATE that sets updated_at explicitly keeps its value on
+# both backends. Revision 010 installs the same triggers on existing databases.
+_SET_UPDATED_AT_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+        NEW.updated_at = now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+""")
+
+
+def _add_updated_at_trigger(table) -> None:
+    """Create the updated_at trigger whenever the table is created."""
+    name = f"trg_{table.name}_updated_at"
+    event.listen(table, "after_create", _SET_UPDATED_AT_FUNCTION.execute_if(dialect="postgresql"))
+    event.listen(table, "after_create", DDL(
+        f"CREATE TRIGGER {name} BEFORE UPDATE ON {table.name} "
+        f"FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+    ).execute_if(dialect="postgresql"))
+    # SQLite triggers cannot assign NEW, so the row is touched after the update;
+    # the WHEN clause keeps explicit updated_at writes and stops recursion
+    event.listen(table, "after_create", DDL(
+        f"CREATE TRIGGER {name} AFTER UPDATE ON {table.name} "
+        f"FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN "
+        f"UPDATE {table.name} SET updated_at = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END"
+    ).execute_if(dialect="sqlite"))
+
+
+for _model in (Company, Function, Team, VacationPeriod, VacationAllocation, User, VacationRequest):
+    _add_updated_at_trigger(_model.__table__)
@@ -4,15 +4,20 @@ from datetime import datetime, timezone
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, and_, update, delete, exists, tuple_, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from app.database import get_db
 from app.models import (
     User, Team, TeamMembership, TeamManagerAssignment, 
-    Function, Company, AuditAction, UserRole
+    Function, Company, AuditLog, AuditAction, UserRole, uuid7
+)
+from app.auth import (
+    get_current_user, require_role, create_invite_token, hash_password, invalidate_user_cache
 )
-from app.auth import get_current_user, require_role, create_invite_token, hash_password
 from app.audit import log_audit
 from app.schemas import (
     UserResponse,
@@ -26,6 +31,7 @@ from app.schemas import (
     FunctionResponse,
     TeamCreate,
     TeamResponse,
+    TeamUsersBatchRequest,
     MessageResponse,
 )
 
@@ -46,7 +52,6 @@ async def create_company(
     company = Company(name=request.name)
     db.add(company)
     await db.commit()
-    await db.refresh(company)
     
     await log_audit(
         db, current_user, AuditAction.TEAM_CREATED, "company", company.id, 
@@ -62,7 +67,7 @@ async def list_companies(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: List all companies."""
-    result = await db.execute(select(Company))
+    result = await db.execute(select(Company).options(raiseload("*")))
     return result.scalars().all()
 
 
@@ -73,8 +78,7 @@ async def get_company(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Get company by ID."""
-    result = await db.execute(select(Company).where(Company.id == company_id))
-    company = result.scalar_one_or_none()
+    company = await db.get(Company, company_id)
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -94,8 +98,7 @@ async def create_function(
 ):
     """Admin: Create a new function/department."""
     # Verify company exists
-    company_result = await db.execute(select(Company).where(Company.id == request.company_id))
-    if not company_result.scalar_one_or_none():
+    if not await db.get(Company, request.company_id):
         raise HTTPException(status_code=404, detail="Company not found")
     
     function = Function(
@@ -104,7 +107,6 @@ async def create_function(
     )
     db.add(function)
     await db.commit()
-    await db.refresh(function)
     
     await log_audit(
         db, current_user, AuditAction.TEAM_CREATED, "function", function.id, 
@@ -121,7 +123,7 @@ async def list_functions(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: List functions, optionally filtered by company."""
-    query = select(Function)
+    query = select(Function).options(raiseload("*"))
     if company_id:
         query = query.where(Function.company_id == company_id)
     result = await db.execute(query)
@@ -135,8 +137,7 @@ async def get_function(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Get function by ID."""
-    result = await db.execute(select(Function).where(Function.id == function_id))
-    function = result.scalar_one_or_none()
+    function = await db.get(Function, function_id)
     
     if not function:
         raise HTTPException(status_code=404, detail="Function not found")
@@ -156,8 +157,7 @@ async def create_team(
 ):
     """Admin: Create a new team."""
     # Verify company exists
-    company_result = await db.execute(select(Company).where(Company.id == request.company_id))
-    if not company_result.scalar_one_or_none():
+    if not await db.get(Company, request.company_id):
         raise HTTPException(status_code=404, detail="Company not found")
     
     team = Team(
@@ -166,7 +166,6 @@ async def create_team(
     )
     db.add(team)
     await db.commit()
-    await db.refresh(team)
     
     await log_audit(
         db, current_user, AuditAction.TEAM_CREATED, "team", team.id, 
@@ -183,7 +182,7 @@ async def list_teams(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: List teams, optionally filtered by company."""
-    query = select(Team)
+    query = select(Team).options(raiseload("*"))
     if company_id:
         query = query.where(Team.company_id == company_id)
     result = await db.execute(query)
@@ -197,8 +196,7 @@ async def get_team(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Get team by ID."""
-    result = await db.execute(select(Team).where(Team.id == team_id))
-    team = result.scalar_one_or_none()
+    team = await db.get(Team, team_id)
     
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
@@ -206,6 +204,61 @@ async def get_team(
     return team
 
 
+def _user_column(column):
+    """Select one column of the user bound to ``user_id``."""
+    return select(column).where(User.id == bindparam("user_id")).scalar_subquery()
+
+
+# Built once at import; callers only bind the ids
+_TEAM_AND_USER_STMT = select(
+    select(Team.company_id).where(Team.id == bindparam("team_id")).scalar_subquery().label("team_company_id"),
+    _user_column(User.id).label("user_exists"),
+    _user_column(User.company_id).label("user_company_id"),
+    _user_column(User.role).label("user_role"),
+)
+
+
+async def _load_team_and_user(db: AsyncSession, team_id: UUID, user_id: UUID):
+    """Check a team and a user in a single query.
+    
+    Args:
+        db: The database session.
+        team_id: The team's UUID.
+        user_id: The user's UUID.
+        
+    Returns:
+        Row with ``team_company_id`` and ``user_exists`` (None when the team
+        or user is missing), ``user_company_id`` and ``user_role``.
+    """
+    result = await db.execute(_TEAM_AND_USER_STMT, {"team_id": team_id, "user_id": user_id})
+    return result.one()
+
+
+async def _insert_team_links(db: AsyncSession, link_model, team_id: UUID, user_ids: list[UUID]) -> list[UUID]:
+    """Insert team links, skipping users that are already linked.
+    
+    Uses INSERT ... ON CONFLICT DO NOTHING RETURNING, so the existence check
+    and the insert are one atomic statement.
+    
+    Args:
+        db: The database session.
+        link_model: TeamMembership or TeamManagerAssignment.
+        team_id: The team's UUID.
+        user_ids: The user UUIDs to link.
+        
+    Returns:
+        The UUIDs of the users that were newly linked.
+    """
+    dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    result = await db.execute(
+        dialect_insert(link_model)
+        .on_conflict_do_nothing(index_elements=["user_id", "team_id"])
+        .returning(link_model.user_id),
+        [{"user_id": user_id, "team_id": team_id} for user_id in user_ids]
+    )
+    return list(result.scalars())
+
+
 @router.post("/teams/{team_id}/members/{user_id}", response_model=MessageResponse)
 async def add_team_member(
     team_id: UUID,
@@ -214,32 +267,14 @@ async def add_team_member(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Add a user to a team."""
-    # Verify team exists
-    team_result = await db.execute(select(Team).where(Team.id == team_id))
-    team = team_result.scalar_one_or_none()
-    if not team:
+    row = await _load_team_and_user(db, team_id, user_id)
+    if row.team_company_id is None:
         raise HTTPException(status_code=404, detail="Team not found")
-    
-    # Verify user exists
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalar_one_or_none()
-    if not user:
+    if row.user_exists is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Check if already a member
-    existing = await db.execute(
-        select(TeamMembership).where(
-            and_(
-                TeamMembership.user_id == user_id,
-                TeamMembership.team_id == team_id
-            )
-        )
-    )
-    if existing.scalar_one_or_none():
+    if not await _insert_team_links(db, TeamMembership, team_id, [user_id]):
         raise HTTPException(status_code=400, detail="User is already a team member")
-    
-    membership = TeamMembership(user_id=user_id, team_id=team_id)
-    db.add(membership)
     await db.commit()
     
     await log_audit(
@@ -250,6 +285,62 @@ async def add_team_member(
     return {"message": "User added to team"}
 
 
+async def _check_batch_users(
+    db: AsyncSession, team_id: UUID, user_ids: list[UUID], same_company: bool = False
+) -> None:
+    """Check that a team and every user of a batch request exist.
+    
+    Only ids are selected; no team or user rows are loaded.
+    
+    Args:
+        db: The database session.
+        team_id: The team's UUID.
+        user_ids: The requested user UUIDs, duplicates removed.
+        same_company: Whether every user must belong to the team's company.
+        
+    Raises:
+        HTTPException: If the team or any of the users does not exist, or a
+            user is in another company when ``same_company`` is set.
+    """
+    team_company_id = await db.scalar(select(Team.company_id).where(Team.id == team_id))
+    if team_company_id is None:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    user_result = await db.execute(
+        select(User.id, (User.company_id == team_company_id).label("in_team_company"))
+        .where(User.id.in_(user_ids))
+    )
+    users = user_result.all()
+    if len(users) != len(user_ids):
+        raise HTTPException(status_code=404, detail="User not found")
+    if same_company and not all(user.in_team_company for user in users):
+        raise HTTPException(status_code=400, detail="User must be in the same company as the team")
+
+
+@router.post("/teams/{team_id}/members:batch", response_model=MessageResponse)
+async def add_team_members(
+    team_id: UUID,
+    request: TeamUsersBatchRequest,
+    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Admin: Add several users to a team. Existing members are skipped."""
+    user_ids = list(dict.fromkeys(request.user_ids))
+    await _check_batch_users(db, team_id, user_ids)
+    
+    to_add = await _insert_team_links(db, TeamMembership, team_id, user_ids)
+    
+    if to_add:
+        await db.commit()
+        
+        await log_audit(
+            db, current_user, AuditAction.USER_UPDATED, "team", team_id,
+            {"action": "add_members", "user_ids": [str(user_id) for user_id in to_add]}
+        )
+    
+    return {"message": f"{len(to_add)} user(s) added to team"}
+
+
 @router.delete("/teams/{team_id}/members/{user_id}", response_model=MessageResponse)
 async def remove_team_member(
     team_id: UUID,
@@ -259,19 +350,16 @@ async def remove_team_member(
 ):
     """Admin: Remove a user from a team."""
     result = await db.execute(
-        select(TeamMembership).where(
+        delete(TeamMembership).where(
             and_(
                 TeamMembership.user_id == user_id,
                 TeamMembership.team_id == team_id
             )
         )
     )
-    membership = result.scalar_one_or_none()
-    
-    if not membership:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Team membership not found")
     
-    await db.delete(membership)
     await db.commit()
     
     await log_audit(
@@ -290,40 +378,25 @@ async def assign_team_manager(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Assign a user as manager of a team."""
-    # Verify team exists
-    team_result = await db.execute(select(Team).where(Team.id == team_id))
-    team = team_result.scalar_one_or_none()
-    if not team:
+    row = await _load_team_and_user(db, team_id, user_id)
+    if row.team_company_id is None:
         raise HTTPException(status_code=404, detail="Team not found")
-    
-    # Verify user exists and is in the company
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalar_one_or_none()
-    if not user:
+    if row.user_exists is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if user.company_id != team.company_id:
+    if row.user_company_id != row.team_company_id:
         raise HTTPException(status_code=400, detail="User must be in the same company as the team")
     
-    # Check if already a manager
-    existing = await db.execute(
-        select(TeamManagerAssignment).where(
-            and_(
-                TeamManagerAssignment.user_id == user_id,
-                TeamManagerAssignment.team_id == team_id
-            )
-        )
-    )
-    if existing.scalar_one_or_none():
+    if not await _insert_team_links(db, TeamManagerAssignment, team_id, [user_id]):
         raise HTTPException(status_code=400, detail="User is already a team manager")
     
     # Update user role if not already manager
-    if user.role == UserRole.USER:
-        user.role = UserRole.MANAGER
-    
-    assignment = TeamManagerAssignment(user_id=user_id, team_id=team_id)
-    db.add(assignment)
+    if row.user_role == UserRole.USER:
+        await db.execute(
+            update(User).where(User.id == user_id).values(role=UserRole.MANAGER)
+        )
     await db.commit()
+    invalidate_user_cache(user_id)
     
     await log_audit(
         db, current_user, AuditAction.MANAGER_ASSIGNED, "team", team_id, 
@@ -333,6 +406,40 @@ async def assign_team_manager(
     return {"message": "Team manager assigned"}
 
 
+@router.post("/teams/{team_id}/managers:batch", response_model=MessageResponse)
+async def assign_team_managers(
+    team_id: UUID,
+    request: TeamUsersBatchRequest,
+    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Admin: Assign several users as managers of a team. Existing managers are skipped."""
+    user_ids = list(dict.fromkeys(request.user_ids))
+    await _check_batch_users(db, team_id, user_ids, same_company=True)
+    
+    to_add = await _insert_team_links(db, TeamManagerAssignment, team_id, user_ids)
+    
+    if to_add:
+        # Promote plain users to managers in one statement
+        promote_result = await db.execute(
+            update(User)
+            .where(User.id.in_(to_add), User.role == UserRole.USER)
+            .values(role=UserRole.MANAGER)
+            .returning(User.id)
+        )
+        to_promote = promote_result.scalars().all()
+        await db.commit()
+        for user_id in to_promote:
+            invalidate_user_cache(user_id)
+        
+        await log_audit(
+            db, current_user, AuditAction.MANAGER_ASSIGNED, "team", team_id,
+            {"manager_ids": [str(user_id) for user_id in to_add]}
+        )
+    
+    return {"message": f"{len(to_add)} team manager(s) assigned"}
+
+
 @router.delete("/teams/{team_id}/managers/{user_id}", response_model=MessageResponse)
 async def remove_team_manager(
     team_id: UUID,
@@ -342,32 +449,30 @@ async def remove_team_manager(
 ):
     """Admin: Remove a user's manager assignment from a team."""
     result = await db.execute(
-        select(TeamManagerAssignment).where(
+        delete(TeamManagerAssignment).where(
             and_(
                 TeamManagerAssignment.user_id == user_id,
                 TeamManagerAssignment.team_id == team_id
             )
         )
     )
-    assignment = result.scalar_one_or_none()
-    
-    if not assignment:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Manager assignment not found")
     
-    await db.delete(assignment)
-    await db.commit()
-    
-    # Check if user is still manager of any teams
-    remaining = await db.execute(
-        select(TeamManagerAssignment).where(TeamManagerAssignment.user_id == user_id)
+    # Demote to user if no longer managing any teams; the NOT EXISTS probe is
+    # an index seek on uq_manager_team's leading user_id column
+    demoted = await db.execute(
+        update(User)
+        .where(
+            User.id == user_id,
+            User.role == UserRole.MANAGER,
+            ~exists().where(TeamManagerAssignment.user_id == user_id)
+        )
+        .values(role=UserRole.USER)
     )
-    if not remaining.scalar_one_or_none():
-        # Demote to user if no longer managing any teams
-        user_result = await db.execute(select(User).where(User.id == user_id))
-        user = user_result.scalar_one_or_none()
-        if user and user.role == UserRole.MANAGER:
-            user.role = UserRole.USER
-            await db.commit()
+    await db.commit()
+    if demoted.rowcount:
+        invalidate_user_cache(user_id)
     
     await log_audit(
         db, current_user, AuditAction.MANAGER_REMOVED, "team", team_id, 
@@ -381,6 +486,10 @@ async def remove_team_manager(
 # User Management (Existing)
 # =============================================================================
 
+# Built once at import; callers only bind the email
+_USER_ID_BY_EMAIL_STMT = select(User.id).where(User.email == bindparam("email")).limit(1)
+
+
 @router.post("/invite", response_model=InviteResponse)
 async def invite_user(
     request: InviteUserRequest,
@@ -396,15 +505,17 @@ async def invite_user(
         )
     
     # Check if user already exists
-    result = await db.execute(select(User).where(User.email == request.email))
-    if result.scalar_one_or_none():
+    existing_id = await db.scalar(_USER_ID_BY_EMAIL_STMT, {"email": request.email})
+    if existing_id is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists"
         )
     
-    # Create user (inactive, no password yet)
+    # Create user (inactive, no password yet). The id is assigned up front so
+    # the invite token can reference it without an extra flush.
     user = User(
+        id=uuid7(),
         email=request.email,
         first_name=request.first_name,
         last_name=request.last_name,
@@ -415,15 +526,16 @@ async def invite_user(
         hashed_password=None
     )
     db.add(user)
-    await db.flush()
-    
-    # Add to teams
-    for team_id in request.team_ids:
-        membership = TeamMembership(user_id=user.id, team_id=team_id)
-        db.add(membership)
-    
-    # Create invite token
     invite = create_invite_token(db, user.id, created_by=current_user.id)
+    
+    # Add to teams in one multi-row INSERT. Sessions do not autoflush, so the
+    # user must be written first for the memberships' foreign key.
+    if request.team_ids:
+        await db.flush()
+        await db.execute(
+            insert(TeamMembership),
+            [{"user_id": user.id, "team_id": team_id} for team_id in dict.fromkeys(request.team_ids)]
+        )
     await db.commit()
     
     return {
@@ -441,8 +553,7 @@ async def deactivate_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Deactivate a user."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -452,7 +563,7 @@ async def deactivate_user(
     
     user.is_active = False
     await db.commit()
-    await db.refresh(user)
+    invalidate_user_cache(user_id)
     
     return user
 
@@ -464,8 +575,7 @@ async def admin_reset_password(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Reset user's password (invalidate current sessions, send new invite)."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -478,22 +588,70 @@ async def admin_reset_password(
     user.is_active = False
     
     await db.commit()
+    invalidate_user_cache(user_id)
     
     return {"message": "Password reset. User will need to use password reset flow."}
 
 
+def _decode_cursor(
+    after_created_at: Optional[datetime], after_id: Optional[UUID]
+) -> Optional[tuple[datetime, UUID]]:
+    """Validate the keyset cursor of a list endpoint.
+    
+    Args:
+        after_created_at: ``created_at`` of the last row of the previous page.
+        after_id: ``id`` of the last row of the previous page.
+        
+    Returns:
+        The ``(created_at, id)`` cursor, or None when neither is given.
+        
+    Raises:
+        HTTPException: If only one of the two is given.
+    """
+    if after_created_at is None and after_id is None:
+        return None
+    if after_created_at is None or after_id is None:
+        raise HTTPException(
+            status_code=400,
+            detail="after_created_at and after_id must be given together"
+        )
+    return after_created_at, after_id
+
+
+# Columns serialized by UserResponse
+_USER_RESPONSE_COLUMNS = tuple(getattr(User, name) for name in UserResponse.model_fields)
+
+
 @router.get("/users", response_model=list[UserResponse])
 async def list_users(
     current_user: User = Depends(require_role(UserRole.ADMIN)),
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[UUID] = None,
 ):
-    """Admin: List all users."""
-    result = await db.execute(
-        select(User).offset(skip).limit(limit).order_by(User.created_at.desc())
+    """Admin: List all users, newest first.
+    
+    Selects only the UserResponse columns and returns plain rows, so the
+    password hash is never read and no ORM objects are built. Pass the
+    ``created_at`` and ``id`` of the last user of a page as
+    ``after_created_at``/``after_id`` to fetch the next page with an index
+    seek instead of skipping ``skip`` rows.
+    """
+    query = (
+        select(*_USER_RESPONSE_COLUMNS)
+        .order_by(User.created_at.desc(), User.id.desc())
+        .limit(limit)
     )
-    return result.scalars().all()
+    cursor = _decode_cursor(after_created_at, after_id)
+    if cursor is not None:
+        query = query.where(tuple_(User.created_at, User.id) < tuple_(*cursor))
+    else:
+        query = query.offset(skip)
+    
+    result = await db.execute(query)
+    return result.all()
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -503,8 +661,7 @@ async def get_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Get user by ID."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -523,8 +680,7 @@ async def update_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: Update user."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -538,7 +694,7 @@ async def update_user(
         setattr(user, field, value)
     
     await db.commit()
-    await db.refresh(user)
+    invalidate_user_cache(user_id)
     
     return user
 
@@ -553,11 +709,26 @@ async def list_audit_logs(
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[UUID] = None,
 ):
-    """Admin: List audit logs."""
-    from app.models import AuditLog
-    
-    result = await db.execute(
-        select(AuditLog).offset(skip).limit(limit).order_by(AuditLog.created_at.desc())
+    """Admin: List audit logs, newest first.
+    
+    Pass the ``created_at`` and ``id`` of the last entry of a page as
+    ``after_created_at``/``after_id`` to fetch the next page with an index
+    seek instead of skipping ``skip`` rows.
+    """
+    query = (
+        select(AuditLog)
+        .options(raiseload("*"))
+        .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+        .limit(limit)
     )
+    cursor = _decode_cursor(after_created_at, after_id)
+    if cursor is not None:
+        query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*cursor))
+    else:
+        query = query.offset(skip)
+    
+    result = await db.execute(query)
     return result.scalars().all()
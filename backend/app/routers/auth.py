@@ -1,32 +1,31 @@
 """Authentication router."""
-import os
 from datetime import datetime, timezone
-from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Response, Request, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, Request, status
+from sqlalchemy import select, update, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import User, InviteToken, PasswordResetToken
+from app.config import settings
+from app.database import get_db, get_db_context
+from app.models import User, InviteToken, PasswordResetToken, hash_token
 from app.auth import (
     create_access_token,
-    create_refresh_token,
-    create_tokens,
     create_and_store_refresh_token,
-    decode_token,
+    create_password_reset_token,
     verify_password,
     hash_password,
+    DUMMY_PASSWORD_HASH,
     get_current_user,
-    require_admin,
-    validate_refresh_token,
+    get_user_by_email,
+    get_user_by_id,
+    consume_refresh_token,
     revoke_all_user_refresh_tokens,
+    invalidate_user_cache,
 )
 from app.middleware.rate_limit import account_lockout_store
 from app.schemas import (
     Token,
     LoginRequest,
-    RefreshTokenRequest,
     SetPasswordRequest,
     PasswordResetRequest,
     PasswordResetConfirmRequest,
@@ -35,15 +34,45 @@ from app.schemas import (
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Built once at import; callers only bind the values. A one-time token is
+# marked used and resolved to its user in the same statement, so a token
+# can only ever be redeemed once.
+_CONSUME_INVITE_STMT = (
+    update(InviteToken)
+    .where(
+        InviteToken.token_hash == bindparam("digest"),
+        InviteToken.used_at.is_(None),
+        InviteToken.expires_at > bindparam("now"),
+    )
+    .values(used_at=bindparam("now"))
+    .returning(InviteToken.user_id)
+)
+_CONSUME_RESET_STMT = (
+    update(PasswordResetToken)
+    .where(
+        PasswordResetToken.token_hash == bindparam("digest"),
+        PasswordResetToken.used_at.is_(None),
+        PasswordResetToken.expires_at > bindparam("now"),
+    )
+    .values(used_at=bindparam("now"))
+    .returning(PasswordResetToken.user_id)
+)
+_USER_ID_BY_EMAIL_STMT = select(User.id).where(User.email == bindparam("email")).limit(1)
 
-@router.post("/login", response_model=Token)
-async def login(
-    login_data: LoginRequest,
-    response: Response,
-    request: Request,
-    db: AsyncSession = Depends(get_db)
-):
-    """Login with email and password. Returns access + refresh token (refresh in HTTP-only cookie)."""
+
+async def _authenticate(login_data: LoginRequest, db: AsyncSession) -> User:
+    """Check credentials and lockout state for a login attempt.
+    
+    Args:
+        login_data: The submitted email and password.
+        db: The database session.
+        
+    Returns:
+        The authenticated user.
+        
+    Raises:
+        HTTPException: If the account is locked or the credentials are invalid.
+    """
     # Check account lockout
     is_allowed, error_message = await account_lockout_store.check_login(login_data.email)
     if not is_allowed:
@@ -53,11 +82,12 @@ async def login(
         )
     
     # Find user
-    result = await db.execute(select(User).where(User.email == login_data.email))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_email(db, login_data.email)
     
     if not user:
-        # Record failure for non-existent user (prevent user enumeration)
+        # Record failure for non-existent user and spend the same hashing time
+        # as a real check (prevent user enumeration)
+        await verify_password(login_data.password, DUMMY_PASSWORD_HASH)
         account_lockout_store.record_failure(login_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,6 +95,7 @@ async def login(
         )
     
     if not user.hashed_password:
+        await verify_password(login_data.password, DUMMY_PASSWORD_HASH)
         account_lockout_store.record_failure(login_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -79,7 +110,7 @@ async def login(
         )
     
     # Verify password
-    if not verify_password(login_data.password, user.hashed_password):
+    if not await verify_password(login_data.password, user.hashed_password):
         account_lockout_store.record_failure(login_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -88,6 +119,20 @@ async def login(
     
     # Clear failed attempts on successful login
     account_lockout_store.record_success(login_data.email)
+    return user
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    login_data: LoginRequest,
+    response: Response,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Login with email and password. Returns access + refresh token (refresh in HTTP-only cookie)."""
+    # Serialize attempts per email so concurrent failures cannot overshoot the lockout
+    async with account_lockout_store.guard(login_data.email):
+        user = await _authenticate(login_data, db)
     
     # Create tokens with token rotation
     access_token = create_access_token(user.id, user.email, user.role, user.company_id)
@@ -133,16 +178,15 @@ async def refresh_token(
             detail="No refresh token"
         )
     
-    # Validate refresh token against database
-    user_id = await validate_refresh_token(db, refresh_token)
+    # Validate and revoke the presented refresh token in one statement
+    user_id = await consume_refresh_token(db, refresh_token)
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or revoked refresh token"
         )
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_id(db, user_id)
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -180,17 +224,14 @@ async def set_password(
     db: AsyncSession = Depends(get_db)
 ):
     """Set password via invite token. Activates account."""
-    # Find invite token
-    result = await db.execute(
-        select(InviteToken).where(
-            InviteToken.token == request.token,
-            InviteToken.used_at.is_(None),
-            InviteToken.expires_at > datetime.now(timezone.utc)
-        )
+    # Redeem invite token
+    user_id = await db.scalar(
+        _CONSUME_INVITE_STMT,
+        {"digest": hash_token(request.token), "now": datetime.now(timezone.utc)}
     )
-    invite = result.scalar_one_or_none()
+    user = await db.get(User, user_id) if user_id is not None else None
     
-    if not invite:
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired invite token"
@@ -200,38 +241,58 @@ async def set_password(
     # which enforces minimum 12 chars with complexity requirements
     
     # Hash password and update user
-    hashed = hash_password(request.password)
-    invite.user.hashed_password = hashed
-    invite.user.is_active = True
-    invite.used_at = datetime.now(timezone.utc)
+    hashed = await hash_password(request.password)
+    user.hashed_password = hashed
+    user.is_active = True
     
     # Revoke all existing refresh tokens for security
-    await revoke_all_user_refresh_tokens(db, invite.user.id)
+    await revoke_all_user_refresh_tokens(db, user.id)
     
     await db.commit()
-    await db.refresh(invite.user)
+    invalidate_user_cache(user.id)
+    
+    return user
+
+
+def _deliver_password_reset_link(token: str) -> None:
+    """Deliver a password reset link (dev mode: logs link).
+    
+    Args:
+        token: The plaintext reset token.
+    """
+    if settings.mail_mode == "dev":
+        print(f"🔧 [DEV] Password reset link: http://localhost:5173/reset-password?token={token}")
+
+
+async def _send_password_reset(email: str) -> None:
+    """Create and deliver a reset token if the email belongs to a user.
+    
+    Runs as a background task with its own session, after the response
+    has been sent.
     
-    return invite.user
+    Args:
+        email: The email address the reset was requested for.
+    """
+    async with get_db_context() as db:
+        user_id = await db.scalar(_USER_ID_BY_EMAIL_STMT, {"email": email})
+        if user_id is None:
+            return
+        reset = create_password_reset_token(db, user_id)
+    
+    _deliver_password_reset_link(reset.token)
 
 
 @router.post("/password-reset-request")
 async def password_reset_request(
     request: PasswordResetRequest,
-    db: AsyncSession = Depends(get_db)
+    background_tasks: BackgroundTasks
 ):
-    """Request password reset. Sends email with reset link (dev mode: logs link)."""
-    result = await db.execute(select(User).where(User.email == request.email))
-    user = result.scalar_one_or_none()
-    
-    if user:
-        from app.auth import create_password_reset_token
-        # Create reset token
-        reset = create_password_reset_token(db, user.id)
-        await db.commit()
-        
-        # In dev mode, log the reset link
-        if settings.mail_mode == "dev":
-            print(f"🔧 [DEV] Password reset link: http://localhost:5173/reset-password?token={reset.token}")
+    """Request password reset. Sends email with reset link (dev mode: logs link).
+    
+    The lookup, token creation and delivery all run after the response has
+    been sent, so the response is the same whether or not the email exists.
+    """
+    background_tasks.add_task(_send_password_reset, request.email)
     
     # Always return success to prevent email enumeration
     return {"message": "If the email exists, a reset link has been sent"}
@@ -243,16 +304,13 @@ async def password_reset_confirm(
     db: AsyncSession = Depends(get_db)
 ):
     """Confirm password reset with token."""
-    result = await db.execute(
-        select(PasswordResetToken).where(
-            PasswordResetToken.token == request.token,
-            PasswordResetToken.used_at.is_(None),
-            PasswordResetToken.expires_at > datetime.now(timezone.utc)
-        )
+    user_id = await db.scalar(
+        _CONSUME_RESET_STMT,
+        {"digest": hash_token(request.token), "now": datetime.now(timezone.utc)}
     )
-    reset = result.scalar_one_or_none()
+    user = await db.get(User, user_id) if user_id is not None else None
     
-    if not reset:
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired reset token"
@@ -262,16 +320,13 @@ async def password_reset_confirm(
     # which enforces minimum 12 chars with complexity requirements
     
     # Update password
-    reset.user.hashed_password = hash_password(request.password)
-    reset.used_at = datetime.now(timezone.utc)
+    user.hashed_password = await hash_password(request.password)
     
     # Revoke all existing refresh tokens for security
-    await revoke_all_user_refresh_tokens(db, reset.user.id)
+    await revoke_all_user_refresh_tokens(db, user.id)
     
     await db.commit()
+    invalidate_user_cache(user.id)
     
     return {"message": "Password reset successful"}
 
-
-# Import settings at the bottom to avoid circular imports
-from app.config import settings
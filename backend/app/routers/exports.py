@@ -1,20 +1,23 @@
 """Export router for CSV and XLSX exports of vacation requests."""
 from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import Optional
+from sqlalchemy.orm import joinedload
+from typing import Iterator, Optional
 from uuid import UUID
 from datetime import date, datetime
 from io import StringIO, BytesIO
 import csv
+from itertools import islice
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
 
 from app.database import get_db
 from app.models import (
-    User, VacationRequest, TeamManagerAssignment, Team, UserRole
+    User, VacationRequest, TeamManagerAssignment, Team, UserRole, VacationStatus
 )
 from app.auth import get_current_user
 
@@ -26,15 +29,17 @@ async def _build_export_query(
     db: AsyncSession,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    status: Optional[str] = None,
+    status: Optional[VacationStatus] = None,
     team_id: Optional[UUID] = None,
     user_id: Optional[UUID] = None
 ):
     """Build the vacation request query with role-based filtering."""
+    # All three are many-to-one, so they join into the main query; unlike
+    # selectinload this also works with yield_per batches
     query = select(VacationRequest).options(
-        selectinload(VacationRequest.user),
-        selectinload(VacationRequest.team),
-        selectinload(VacationRequest.approver)
+        joinedload(VacationRequest.user),
+        joinedload(VacationRequest.team),
+        joinedload(VacationRequest.approver)
     ).where(VacationRequest.company_id == current_user.company_id)
     
     # Apply role-based filtering
@@ -42,20 +47,14 @@ async def _build_export_query(
         # Users can only export their own requests
         query = query.where(VacationRequest.user_id == current_user.id)
     elif current_user.role == UserRole.MANAGER:
-        # Managers can export requests from their teams
-        managed_teams = await db.execute(
-            select(TeamManagerAssignment.team_id).where(
-                TeamManagerAssignment.user_id == current_user.id
-            )
+        # Managers can export requests from their teams; the team list is a
+        # subquery, so a manager with no teams simply matches nothing
+        managed_team_ids = select(TeamManagerAssignment.team_id).where(
+            TeamManagerAssignment.user_id == current_user.id
         )
-        team_ids = [t[0] for t in managed_teams.fetchall()]
-        if team_id and team_id in team_ids:
-            team_ids = [team_id]
-        if team_ids:
-            query = query.where(VacationRequest.team_id.in_(team_ids))
-        else:
-            # Manager with no teams - return empty
-            query = query.where(VacationRequest.id.is_(None))
+        query = query.where(VacationRequest.team_id.in_(managed_team_ids))
+        if team_id:
+            query = query.where(VacationRequest.team_id == team_id)
     # Admins can see all within company
     
     # Apply filters
@@ -75,11 +74,92 @@ async def _build_export_query(
     return query
 
 
+# Column titles shared by the CSV and XLSX exports
+_EXPORT_HEADERS = (
+    'ID',
+    'Employee Name',
+    'Employee Email',
+    'Team',
+    'Start Date',
+    'End Date',
+    'Days',
+    'Type',
+    'Status',
+    'Reason',
+    'Approver',
+    'Approved At',
+    'Created At',
+)
+
+# Rows formatted per chunk of a streamed CSV export
+_CSV_CHUNK_ROWS = 500
+
+# Rows fetched per batch when an export reads from a database cursor
+_EXPORT_BATCH_ROWS = 1000
+
+
+def _csv_row(vr: VacationRequest) -> tuple:
+    """Build the CSV fields of one vacation request.
+    
+    Args:
+        vr: The vacation request, with user, team and approver loaded.
+        
+    Returns:
+        The row's fields, in _EXPORT_HEADERS order.
+    """
+    user = vr.user
+    approver = vr.approver
+    approved_at = vr.approved_at
+    return (
+        str(vr.id),
+        f"{user.first_name} {user.last_name}",
+        user.email,
+        vr.team.name if vr.team else "",
+        vr.start_date.isoformat(),
+        vr.end_date.isoformat(),
+        (vr.end_date - vr.start_date).days + 1,
+        vr.vacation_type,
+        vr.status,
+        vr.reason or "",
+        f"{approver.first_name} {approver.last_name}" if approver else "",
+        approved_at.isoformat() if approved_at else "",
+        vr.created_at.isoformat(),
+    )
+
+
+def _iter_csv(requests) -> Iterator[str]:
+    """Format vacation requests as CSV, yielding one chunk of rows at a time.
+    
+    A single small buffer is reused, so the full CSV text is never held in
+    memory and the first bytes go out before the last row is formatted.
+    
+    Args:
+        requests: The loaded vacation requests, with user, team and approver.
+        
+    Yields:
+        CSV text chunks, starting with the header row.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(_EXPORT_HEADERS)
+    
+    rows = map(_csv_row, requests)
+    while chunk := list(islice(rows, _CSV_CHUNK_ROWS)):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    
+    # Header only, when there are no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
 @router.get("/csv")
 async def export_vacation_requests_csv(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    status: Optional[str] = None,
+    status: Optional[VacationStatus] = None,
     team_id: Optional[UUID] = None,
     user_id: Optional[UUID] = None,
     current_user: User = Depends(get_current_user),
@@ -94,50 +174,8 @@ async def export_vacation_requests_csv(
     result = await db.execute(query)
     requests = result.scalars().all()
     
-    # Generate CSV
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        'ID',
-        'Employee Name',
-        'Employee Email',
-        'Team',
-        'Start Date',
-        'End Date',
-        'Days',
-        'Type',
-        'Status',
-        'Reason',
-        'Approver',
-        'Approved At',
-        'Created At'
-    ])
-    
-    # Write data rows
-    for vr in requests:
-        days = (vr.end_date - vr.start_date).days + 1
-        approver_name = f"{vr.approver.first_name} {vr.approver.last_name}" if vr.approver else ""
-        writer.writerow([
-            str(vr.id),
-            f"{vr.user.first_name} {vr.user.last_name}",
-            vr.user.email,
-            vr.team.name if vr.team else "",
-            vr.start_date.isoformat(),
-            vr.end_date.isoformat(),
-            str(days),
-            vr.vacation_type,
-            vr.status,
-            vr.reason or "",
-            approver_name,
-            vr.approved_at.isoformat() if vr.approved_at else "",
-            vr.created_at.isoformat()
-        ])
-    
-    # Return CSV response
-    return Response(
-        content=output.getvalue(),
+    return StreamingResponse(
+        _iter_csv(requests),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename=vacation_requests_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -149,7 +187,7 @@ async def export_vacation_requests_csv(
 async def export_vacation_requests_xlsx(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    status: Optional[str] = None,
+    status: Optional[VacationStatus] = None,
     team_id: Optional[UUID] = None,
     user_id: Optional[UUID] = None,
     current_user: User = Depends(get_current_user),
@@ -161,47 +199,44 @@ async def export_vacation_requests_xlsx(
         current_user, db, start_date, end_date, status, team_id, user_id
     )
     
-    result = await db.execute(query)
-    requests = result.scalars().all()
+    # Rows are pulled from the database in batches while the sheet is written
+    requests = await db.stream_scalars(query.execution_options(yield_per=_EXPORT_BATCH_ROWS))
     
-    # Create workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Vacation Requests"
+    # Create workbook. Write-only mode streams rows into the sheet XML
+    # instead of building a Cell object for every value.
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title="Vacation Requests")
     
     # Define styles
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="3B82F6", end_color="3B82F6", fill_type="solid")
+    header_alignment = Alignment(horizontal="center")
     
-    # Write header
-    headers = [
-        'ID',
-        'Employee Name',
-        'Employee Email',
-        'Team',
-        'Start Date',
-        'End Date',
-        'Days',
-        'Type',
-        'Status',
-        'Reason',
-        'Approver',
-        'Approved At',
-        'Created At'
-    ]
+    def header_row(sheet, titles):
+        """Build a styled header row for a write-only sheet."""
+        cells = []
+        for title in titles:
+            cell = WriteOnlyCell(sheet, value=title)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            cells.append(cell)
+        return cells
     
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center")
+    # Column widths have to be set before the first row is written
+    for col in range(1, len(_EXPORT_HEADERS) + 1):
+        ws.column_dimensions[get_column_letter(col)].width = 15
+    
+    ws.append(header_row(ws, _EXPORT_HEADERS))
     
-    # Write data rows
-    for row_num, vr in enumerate(requests, 2):
+    # Write data rows; date values get the YYYY-MM-DD format automatically
+    status_counts = {}
+    async for vr in requests:
         days = (vr.end_date - vr.start_date).days + 1
         approver_name = f"{vr.approver.first_name} {vr.approver.last_name}" if vr.approver else ""
+        status_counts[vr.status] = status_counts.get(vr.status, 0) + 1
         
-        data = [
+        ws.append((
             str(vr.id),
             f"{vr.user.first_name} {vr.user.last_name}",
             vr.user.email,
@@ -215,37 +250,13 @@ async def export_vacation_requests_xlsx(
             approver_name,
             vr.approved_at.isoformat() if vr.approved_at else "",
             vr.created_at.isoformat()
-        ]
-        
-        for col, value in enumerate(data, 1):
-            cell = ws.cell(row=row_num, column=col, value=value)
-            if isinstance(value, (date, datetime)):
-                cell.number_format = "YYYY-MM-DD"
-            cell.alignment = Alignment(horizontal="left")
-    
-    # Auto-adjust column widths
-    for col in range(1, len(headers) + 1):
-        ws.column_dimensions[get_column_letter(col)].width = 15
-    
-    # Add summary sheet
-    wb.create_sheet(title="Summary")
-    summary_ws = wb["Summary"]
-    
-    # Count by status
-    status_counts = {}
-    for vr in requests:
-        status_counts[vr.status] = status_counts.get(vr.status, 0) + 1
-    
-    summary_ws.cell(row=1, column=1, value="Status")
-    summary_ws.cell(row=1, column=2, value="Count")
-    summary_ws["A1"].font = header_font
-    summary_ws["A1"].fill = header_fill
-    summary_ws["B1"].font = header_font
-    summary_ws["B1"].fill = header_fill
+        ))
     
-    for row, (status, count) in enumerate(status_counts.items(), 2):
-        summary_ws.cell(row=row, column=1, value=status)
-        summary_ws.cell(row=row, column=2, value=count)
+    # Add summary sheet with the count by status
+    summary_ws = wb.create_sheet(title="Summary")
+    summary_ws.append(header_row(summary_ws, ["Status", "Count"]))
+    for status, count in status_counts.items():
+        summary_ws.append((status, count))
     
     # Save to BytesIO
     output = BytesIO()
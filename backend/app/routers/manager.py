@@ -4,7 +4,7 @@ from uuid import UUID
 from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -24,6 +24,51 @@ from app.schemas import (
 router = APIRouter(prefix="/manager", tags=["Manager"])
 
 
+async def _load_managed_team(db: AsyncSession, current_user: User, team_id: UUID, forbidden_detail: str) -> Team:
+    """Load a team the current user may manage, checking access in one query.
+    
+    For managers the team row and the manager assignment check come back
+    from the same SELECT; admins may access any team of their company.
+    
+    Args:
+        db: The database session.
+        current_user: The manager or admin making the request.
+        team_id: The team's UUID.
+        forbidden_detail: Error detail when the user does not manage the team.
+        
+    Returns:
+        The team.
+        
+    Raises:
+        HTTPException: 403 if the user does not manage the team or it belongs
+            to another company, 404 if the team does not exist.
+    """
+    if current_user.role == UserRole.ADMIN:
+        team = await db.get(Team, team_id)
+    else:
+        result = await db.execute(
+            select(
+                Team,
+                exists().where(
+                    TeamManagerAssignment.user_id == current_user.id,
+                    TeamManagerAssignment.team_id == Team.id
+                )
+            ).where(Team.id == team_id)
+        )
+        row = result.one_or_none()
+        if row is None or not row[1]:
+            raise HTTPException(status_code=403, detail=forbidden_detail)
+        team = row[0]
+    
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    if team.company_id != current_user.company_id:
+        raise HTTPException(status_code=403, detail="Cannot access teams from other companies")
+    
+    return team
+
+
 @router.get("/teams", response_model=List[TeamResponse])
 async def get_managed_teams(
     current_user: User = Depends(require_role(UserRole.MANAGER, UserRole.ADMIN)),
@@ -55,27 +100,7 @@ async def get_team_members(
     db: AsyncSession = Depends(get_db)
 ):
     """Manager: Get members of a team they manage."""
-    # Verify manager access
-    if current_user.role != UserRole.ADMIN:
-        manager_check = await db.execute(
-            select(TeamManagerAssignment).where(
-                and_(
-                    TeamManagerAssignment.user_id == current_user.id,
-                    TeamManagerAssignment.team_id == team_id
-                )
-            )
-        )
-        if not manager_check.scalar_one_or_none():
-            raise HTTPException(status_code=403, detail="Not authorized to view this team")
-    
-    # Verify team exists and is in same company
-    team_result = await db.execute(select(Team).where(Team.id == team_id))
-    team = team_result.scalar_one_or_none()
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
-    
-    if team.company_id != current_user.company_id:
-        raise HTTPException(status_code=403, detail="Cannot access teams from other companies")
+    await _load_managed_team(db, current_user, team_id, "Not authorized to view this team")
     
     result = await db.execute(
         select(User)
@@ -96,29 +121,13 @@ async def get_team_vacation_requests(
     db: AsyncSession = Depends(get_db)
 ):
     """Manager: Get vacation requests for a team they manage."""
-    # Verify manager access
-    if current_user.role != UserRole.ADMIN:
-        manager_check = await db.execute(
-            select(TeamManagerAssignment).where(
-                and_(
-                    TeamManagerAssignment.user_id == current_user.id,
-                    TeamManagerAssignment.team_id == team_id
-                )
-            )
-        )
-        if not manager_check.scalar_one_or_none():
-            raise HTTPException(status_code=403, detail="Not authorized to view this team")
-    
-    # Verify team exists and is in same company
-    team_result = await db.execute(select(Team).where(Team.id == team_id))
-    team = team_result.scalar_one_or_none()
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
-    
-    if team.company_id != current_user.company_id:
-        raise HTTPException(status_code=403, detail="Cannot access teams from other companies")
+    await _load_managed_team(db, current_user, team_id, "Not authorized to view this team")
     
-    query = select(VacationRequest).where(VacationRequest.team_id == team_id)
+    query = (
+        select(VacationRequest)
+        .options(selectinload(VacationRequest.user))
+        .where(VacationRequest.team_id == team_id)
+    )
     
     if start_date:
         query = query.where(VacationRequest.end_date >= start_date)
@@ -131,10 +140,6 @@ async def get_team_vacation_requests(
     result = await db.execute(query)
     requests = result.scalars().all()
     
-    # Load user relationships
-    for vr in requests:
-        await db.refresh(vr, ["user"])
-    
     return requests
 
 
@@ -154,20 +159,13 @@ async def get_pending_requests(
         ).options(selectinload(VacationRequest.user))
     else:
         # Manager sees only their teams
-        managed_teams = await db.execute(
-            select(TeamManagerAssignment.team_id).where(
-                TeamManagerAssignment.user_id == current_user.id
-            )
+        managed_team_ids = select(TeamManagerAssignment.team_id).where(
+            TeamManagerAssignment.user_id == current_user.id
         )
-        team_ids = [t[0] for t in managed_teams.fetchall()]
-        
-        if not team_ids:
-            return []
-        
         query = select(VacationRequest).where(
             and_(
                 VacationRequest.status == VacationStatus.PENDING,
-                VacationRequest.team_id.in_(team_ids)
+                VacationRequest.team_id.in_(managed_team_ids)
             )
         ).options(selectinload(VacationRequest.user))
     
@@ -184,27 +182,7 @@ async def remove_team_member(
     db: AsyncSession = Depends(get_db)
 ):
     """Manager: Remove a user from a team they manage."""
-    # Verify manager access
-    if current_user.role != UserRole.ADMIN:
-        manager_check = await db.execute(
-            select(TeamManagerAssignment).where(
-                and_(
-                    TeamManagerAssignment.user_id == current_user.id,
-                    TeamManagerAssignment.team_id == team_id
-                )
-            )
-        )
-        if not manager_check.scalar_one_or_none():
-            raise HTTPException(status_code=403, detail="Not authorized to manage this team")
-    
-    # Verify team exists and is in same company
-    team_result = await db.execute(select(Team).where(Team.id == team_id))
-    team = team_result.scalar_one_or_none()
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
-    
-    if team.company_id != current_user.company_id:
-        raise HTTPException(status_code=403, detail="Cannot access teams from other companies")
+    await _load_managed_team(db, current_user, team_id, "Not authorized to manage this team")
     
     # Find and remove membership
     result = await db.execute(
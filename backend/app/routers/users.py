@@ -8,19 +8,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import User, UserRole
-from app.auth import get_current_user
+from app.auth import get_current_user, invalidate_user_cache
 from app.schemas import UserResponse, UserUpdate
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get current user's profile with teams and function."""
-    await db.refresh(current_user, ["teams", "function"])
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
+    """Get current user's profile."""
     return current_user
 
 
@@ -38,7 +34,7 @@ async def update_current_user(
         setattr(current_user, field, value)
     
     await db.commit()
-    await db.refresh(current_user, ["teams", "function"])
+    invalidate_user_cache(current_user.id)
     
     return current_user
 
@@ -48,26 +44,30 @@ async def list_users(
     company_id: Optional[UUID] = None,
     function_id: Optional[UUID] = None,
     role: Optional[UserRole] = None,
+    skip: int = 0,
+    limit: int = 100,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List users. Admins see all, Managers see company users, Users see only themselves."""
-    if current_user.role == UserRole.ADMIN:
-        # Admin can see all or filter
-        query = select(User)
-        if company_id:
-            query = query.where(User.company_id == company_id)
-    elif current_user.role in (UserRole.MANAGER, UserRole.ADMIN):
-        # Manager sees only their company
-        query = select(User).where(User.company_id == current_user.company_id)
-        if function_id:
-            query = query.where(User.function_id == function_id)
-        if role:
-            query = query.where(User.role == role)
-    else:
+    """List users. Admins and managers see company users, Users see only themselves.
+    
+    Results are scoped to the caller's company; admins may pass another
+    ``company_id`` explicitly.
+    """
+    if current_user.role == UserRole.USER:
         # Regular user can only see themselves
         return [current_user]
     
+    if company_id and company_id != current_user.company_id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Cannot access users from other companies")
+    
+    query = select(User).where(User.company_id == (company_id or current_user.company_id))
+    if function_id:
+        query = query.where(User.function_id == function_id)
+    if role:
+        query = query.where(User.role == role)
+    
+    query = query.order_by(User.created_at.desc(), User.id.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     users = result.scalars().all()
     
@@ -81,8 +81,7 @@ async def get_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific user. Authorization depends on role and company."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -95,7 +94,6 @@ async def get_user(
     elif user.id != current_user.id and current_user.role == UserRole.USER:
         raise HTTPException(status_code=403, detail="Cannot view other users")
     
-    await db.refresh(user, ["teams", "function"])
     return user
 
 
@@ -107,8 +105,7 @@ async def update_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Update a user. Admins and managers can update users in their company."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -129,6 +126,6 @@ async def update_user(
         setattr(user, field, value)
     
     await db.commit()
-    await db.refresh(user, ["teams", "function"])
+    invalidate_user_cache(user_id)
     
     return user
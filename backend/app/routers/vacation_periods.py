@@ -4,7 +4,7 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, func
+from sqlalchemy import select, func, exists, update as sa_update  # 'update' is a parameter name below
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -76,31 +76,28 @@ async def create_vacation_period(
         raise HTTPException(status_code=403, detail="Not authorized to create periods for this company")
     
     # Check for overlapping periods
-    overlap_result = await db.execute(
-        select(VacationPeriod).where(
-            VacationPeriod.company_id == period.company_id,
-            VacationPeriod.start_date <= period.end_date,
-            VacationPeriod.end_date >= period.start_date
-        )
-    )
-    if overlap_result.scalar_one_or_none():
+    overlaps = await db.scalar(select(exists().where(
+        VacationPeriod.company_id == period.company_id,
+        VacationPeriod.start_date <= period.end_date,
+        VacationPeriod.end_date >= period.start_date
+    )))
+    if overlaps:
         raise HTTPException(status_code=400, detail="Overlapping vacation period exists")
     
     # If this is set as default, unset other defaults
     if period.is_default:
-        existing_defaults = await db.execute(
-            select(VacationPeriod).where(
+        await db.execute(
+            sa_update(VacationPeriod)
+            .where(
                 VacationPeriod.company_id == period.company_id,
                 VacationPeriod.is_default == True
             )
+            .values(is_default=False)
         )
-        for existing in existing_defaults.scalars().all():
-            existing.is_default = False
     
     db_period = VacationPeriod(**period.model_dump())
     db.add(db_period)
     await db.commit()
-    await db.refresh(db_period)
     return db_period
 
 
@@ -125,15 +122,15 @@ async def update_vacation_period(
     
     # If setting as default, unset other defaults
     if update.is_default:
-        existing_defaults = await db.execute(
-            select(VacationPeriod).where(
+        await db.execute(
+            sa_update(VacationPeriod)
+            .where(
                 VacationPeriod.company_id == current_user.company_id,
                 VacationPeriod.is_default == True,
                 VacationPeriod.id != period_id
             )
+            .values(is_default=False)
         )
-        for existing in existing_defaults.scalars().all():
-            existing.is_default = False
     
     # Update fields
     update_data = update.model_dump(exclude_unset=True)
@@ -164,12 +161,10 @@ async def delete_vacation_period(
         raise HTTPException(status_code=404, detail="Vacation period not found")
     
     # Check if there are any vacation requests linked to this period
-    requests_result = await db.execute(
-        select(VacationRequest).where(
-            VacationRequest.vacation_period_id == period_id
-        ).limit(1)
-    )
-    if requests_result.scalar_one_or_none():
+    has_requests = await db.scalar(select(exists().where(
+        VacationRequest.vacation_period_id == period_id
+    )))
+    if has_requests:
         raise HTTPException(
             status_code=400, 
             detail="Cannot delete vacation period with existing vacation requests"
@@ -240,37 +235,29 @@ async def create_allocation(
 ):
     """Create a new vacation allocation."""
     # Verify user belongs to same company
-    user_result = await db.execute(
-        select(User).where(User.id == allocation.user_id)
-    )
-    user = user_result.scalar_one_or_none()
+    user = await db.get(User, allocation.user_id)
     if not user or user.company_id != current_user.company_id:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Verify vacation period belongs to same company
-    period_result = await db.execute(
-        select(VacationPeriod).where(
-            VacationPeriod.id == allocation.vacation_period_id,
-            VacationPeriod.company_id == current_user.company_id
-        )
-    )
-    if not period_result.scalar_one_or_none():
+    period_exists = await db.scalar(select(exists().where(
+        VacationPeriod.id == allocation.vacation_period_id,
+        VacationPeriod.company_id == current_user.company_id
+    )))
+    if not period_exists:
         raise HTTPException(status_code=404, detail="Vacation period not found")
     
     # Check for existing allocation
-    existing_result = await db.execute(
-        select(VacationAllocation).where(
-            VacationAllocation.user_id == allocation.user_id,
-            VacationAllocation.vacation_period_id == allocation.vacation_period_id
-        )
-    )
-    if existing_result.scalar_one_or_none():
+    allocation_exists = await db.scalar(select(exists().where(
+        VacationAllocation.user_id == allocation.user_id,
+        VacationAllocation.vacation_period_id == allocation.vacation_period_id
+    )))
+    if allocation_exists:
         raise HTTPException(status_code=400, detail="Allocation already exists for this user and period")
     
     db_allocation = VacationAllocation(**allocation.model_dump())
     db.add(db_allocation)
     await db.commit()
-    await db.refresh(db_allocation)
     return db_allocation
 
 
@@ -467,3 +454,14 @@ async def get_all_vacation_balances(
         ))
     
     return balances
+
+
+# =============================================================================
+# Combined Router
+# =============================================================================
+# Periods, allocations and balance routes merged once so the app includes
+# this module with a single include_router call
+combined_router = APIRouter()
+combined_router.include_router(router)
+combined_router.include_router(router_allocations)
+combined_router.include_router(router_balance)
@@ -36,7 +36,7 @@ async def get_my_vacation_requests(
     db: AsyncSession = Depends(get_db)
 ):
     """Get current user's vacation requests with optional filters."""
-    query = select(VacationRequest).where(
+    query = select(VacationRequest).options(selectinload(VacationRequest.user)).where(
         VacationRequest.user_id == current_user.id
     )
     
@@ -52,10 +52,6 @@ async def get_my_vacation_requests(
     result = await db.execute(query)
     requests = result.scalars().all()
     
-    # Load user relationship
-    for vr in requests:
-        await db.refresh(vr, ["user"])
-    
     return requests
 
 
@@ -183,12 +179,7 @@ async def get_vacation_request(
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific vacation request. Users can only see their own requests or requests from their teams (if manager)."""
-    result = await db.execute(
-        select(VacationRequest)
-        .options(selectinload(VacationRequest.user))
-        .where(VacationRequest.id == request_id)
-    )
-    vr = result.scalar_one_or_none()
+    vr = await db.get(VacationRequest, request_id, options=[selectinload(VacationRequest.user)])
     
     if not vr:
         raise HTTPException(status_code=404, detail="Vacation request not found")
@@ -223,10 +214,7 @@ async def cancel_vacation_request(
     db: AsyncSession = Depends(get_db)
 ):
     """Cancel a pending vacation request. Only the owner can cancel."""
-    result = await db.execute(
-        select(VacationRequest).where(VacationRequest.id == request_id)
-    )
-    vr = result.scalar_one_or_none()
+    vr = await db.get(VacationRequest, request_id)
     
     if not vr:
         raise HTTPException(status_code=404, detail="Vacation request not found")
@@ -304,10 +292,7 @@ async def approve_vacation_request(
     db: AsyncSession = Depends(get_db)
 ):
     """Approve or reject a vacation request. Managers can only act on their team's requests."""
-    result = await db.execute(
-        select(VacationRequest).where(VacationRequest.id == request_id)
-    )
-    vr = result.scalar_one_or_none()
+    vr = await db.get(VacationRequest, request_id)
     
     if not vr:
         raise HTTPException(status_code=404, detail="Vacation request not found")
@@ -360,10 +345,7 @@ async def modify_vacation_request(
     db: AsyncSession = Depends(get_db)
 ):
     """Modify a vacation request's dates/type/reason. Managers can modify their team's requests."""
-    result = await db.execute(
-        select(VacationRequest).where(VacationRequest.id == request_id)
-    )
-    vr = result.scalar_one_or_none()
+    vr = await db.get(VacationRequest, request_id)
     
     if not vr:
         raise HTTPException(status_code=404, detail="Vacation request not found")
@@ -237,6 +237,11 @@ class TeamResponse(BaseModel):
     created_at: datetime
 
 
+class TeamUsersBatchRequest(BaseModel):
+    """Batch of users to add to a team as members or managers."""
+    user_ids: list[UUID] = Field(..., min_length=1, max_length=1000)
+
+
 class TeamWithMembersResponse(BaseModel):
     """Team with members response schema."""
     model_config = ConfigDict(from_attributes=True)
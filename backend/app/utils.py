@@ -6,6 +6,8 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models import VacationPeriod
+
 
 def calculate_business_days(start_date: date, end_date: date) -> int:
     """Calculate the number of business days between two dates (inclusive).
@@ -34,7 +36,7 @@ def calculate_business_days(start_date: date, end_date: date) -> int:
 def get_vacation_period_for_date(
     target_date: date, 
     periods: List["VacationPeriod"]
-) -> Optional["VacationPeriod"]:
+) -> Optional[VacationPeriod]:
     """Find the vacation period that contains the given date.
     
     Args:
@@ -53,7 +55,7 @@ def get_vacation_period_for_date(
 async def get_current_vacation_period(
     company_id: UUID, 
     db: AsyncSession
-) -> Optional["VacationPeriod"]:
+) -> Optional[VacationPeriod]:
     """Get the current active vacation period for a company.
     
     Args:
@@ -63,8 +65,6 @@ async def get_current_vacation_period(
     Returns:
         The current VacationPeriod, or None if not found.
     """
-    from app.models import VacationPeriod
-    
     today = date.today()
     result = await db.execute(
         select(VacationPeriod).where(
@@ -79,7 +79,7 @@ async def get_current_vacation_period(
 async def get_default_vacation_period(
     company_id: UUID,
     db: AsyncSession
-) -> Optional["VacationPeriod"]:
+) -> Optional[VacationPeriod]:
     """Get the default vacation period for a company.
     
     Args:
@@ -89,8 +89,6 @@ async def get_default_vacation_period(
     Returns:
         The default VacationPeriod, or None if not found.
     """
-    from app.models import VacationPeriod
-    
     result = await db.execute(
         select(VacationPeriod).where(
             VacationPeriod.company_id == company_id,
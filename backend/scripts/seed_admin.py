@@ -40,7 +40,7 @@ async def seed_admin():
         # Create admin user
         admin = User(
             email=admin_email,
-            hashed_password=hash_password(admin_password),
+            hashed_password=await hash_password(admin_password),
             first_name=admin_first_name,
             last_name=admin_last_name,
             role=UserRole.ADMIN,
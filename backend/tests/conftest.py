@@ -1,6 +1,7 @@
 """Pytest configuration and fixtures for vacation planner tests."""
 import asyncio
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from typing import AsyncGenerator
 from uuid import uuid4
@@ -8,6 +9,7 @@ from uuid import uuid4
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -24,6 +26,13 @@ from app.auth import hash_password, create_access_token
 os.environ["JWT_SECRET"] = "test-secret-key-for-testing-only"
 os.environ["ENVIRONMENT"] = "testing"
 
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    """Enforce foreign keys on the test database, as production does."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
 # Module-level storage
 _engine = None
 _session_factory = None
@@ -41,6 +50,7 @@ async def db_session():
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
         )
+        event.listen(_engine.sync_engine, "connect", _enable_foreign_keys)
         # Create tables immediately
         async with _engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
@@ -50,6 +60,7 @@ async def db_session():
             _engine,
             class_=AsyncSession,
             expire_on_commit=False,
+            autoflush=False,
         )
     
     # Use the session factory to create a session
@@ -58,21 +69,31 @@ async def db_session():
 
 
 @pytest_asyncio.fixture
-async def client(db_session: AsyncSession):
+async def client(db_session: AsyncSession, monkeypatch):
     """Create a test client using the database session."""
     async def override_get_db():
         async with _session_factory() as session:
             yield session
     
+    @asynccontextmanager
+    async def override_get_db_context():
+        async with _session_factory() as session:
+            yield session
+            await session.commit()
+    
     app.dependency_overrides[get_db] = override_get_db
+    # Background jobs open their own sessions outside dependency injection
+    monkeypatch.setattr("app.routers.auth.get_db_context", override_get_db_context)
     
     # Create a test app without middleware for proper testing
     from fastapi import FastAPI
+    from fastapi.responses import ORJSONResponse
     from app.routers import auth, users, vacation_requests, admin, manager, exports, vacation_periods
     
     test_app = FastAPI(
         title="Vacation Planner API (Test)",
         version="1.0.0",
+        default_response_class=ORJSONResponse,
     )
     
     # Include all routers
@@ -83,9 +104,7 @@ async def client(db_session: AsyncSession):
     test_app.include_router(manager.router, prefix="/api/v1")
     test_app.include_router(exports.router, prefix="/api/v1")
     # Include vacation periods router (has prefix built-in)
-    test_app.include_router(vacation_periods.router, prefix="/api/v1")
-    test_app.include_router(vacation_periods.router_allocations, prefix="/api/v1")
-    test_app.include_router(vacation_periods.router_balance, prefix="/api/v1")
+    test_app.include_router(vacation_periods.combined_router, prefix="/api/v1")
     
     # Add health check
     @test_app.get("/health")
@@ -184,7 +203,7 @@ async def admin_user(db_session: AsyncSession, test_company: Company) -> User:
     """Create an admin user."""
     user = User(
         email=f"admin_{uuid4().hex[:8]}@test.com",
-        hashed_password=hash_password("adminpassword123"),
+        hashed_password=await hash_password("adminpassword123"),
         first_name="Admin",
         last_name="User",
         role=UserRole.ADMIN,
@@ -202,7 +221,7 @@ async def manager_user(db_session: AsyncSession, test_company: Company, test_tea
     """Create a manager user."""
     user = User(
         email=f"manager_{uuid4().hex[:8]}@test.com",
-        hashed_password=hash_password("managerpassword123"),
+        hashed_password=await hash_password("managerpassword123"),
         first_name="Manager",
         last_name="User",
         role=UserRole.MANAGER,
@@ -226,7 +245,7 @@ async def manager_user2(db_session: AsyncSession, test_company: Company, test_te
     """Create a second manager user for different team."""
     user = User(
         email=f"manager2_{uuid4().hex[:8]}@test.com",
-        hashed_password=hash_password("managerpassword123"),
+        hashed_password=await hash_password("managerpassword123"),
         first_name="Manager2",
         last_name="User",
         role=UserRole.MANAGER,
@@ -250,7 +269,7 @@ async def regular_user(db_session: AsyncSession, test_company: Company, test_tea
     """Create a regular user."""
     user = User(
         email=f"user_{uuid4().hex[:8]}@test.com",
-        hashed_password=hash_password("userpassword123"),
+        hashed_password=await hash_password("userpassword123"),
         first_name="Regular",
         last_name="User",
         role=UserRole.USER,
@@ -274,7 +293,7 @@ async def regular_user2(db_session: AsyncSession, test_company: Company, test_te
     """Create a second regular user in different team."""
     user = User(
         email=f"user2_{uuid4().hex[:8]}@test.com",
-        hashed_password=hash_password("userpassword123"),
+        hashed_password=await hash_password("userpassword123"),
         first_name="Regular2",
         last_name="User",
         role=UserRole.USER,
@@ -298,7 +317,7 @@ async def user_from_other_company(db_session: AsyncSession, test_company2: Compa
     """Create a user from a different company for isolation testing."""
     user = User(
         email=f"other_company_{uuid4().hex[:8]}@test.com",
-        hashed_password=hash_password("otherpassword123"),
+        hashed_password=await hash_password("otherpassword123"),
         first_name="Other",
         last_name="Company",
         role=UserRole.USER,
@@ -316,7 +335,7 @@ async def inactive_user(db_session: AsyncSession, test_company: Company) -> User
     """Create an inactive user."""
     user = User(
         email=f"inactive_{uuid4().hex[:8]}@test.com",
-        hashed_password=hash_password("inactivepassword123"),
+        hashed_password=await hash_password("inactivepassword123"),
         first_name="Inactive",
         last_name="User",
         role=UserRole.USER,
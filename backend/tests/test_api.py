@@ -1,7 +1,7 @@
 """Comprehensive API test suite for Vacation Planner."""
 import pytest
 from datetime import date, datetime, timezone, timedelta
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 
 # =============================================================================
@@ -166,6 +166,23 @@ class TestAuthentication:
         assert response.status_code == 200
         assert "message" in response.json()
 
+    @pytest.mark.asyncio
+    async def test_password_reset_request_creates_token(self, client, db_session, regular_user):
+        """Test that the background job stores a reset token for an existing user."""
+        from app.models import PasswordResetToken
+        from sqlalchemy import select
+        
+        response = await client.post(
+            "/api/v1/auth/password-reset-request",
+            json={"email": regular_user.email}
+        )
+        
+        assert response.status_code == 200
+        result = await db_session.execute(
+            select(PasswordResetToken).where(PasswordResetToken.user_id == regular_user.id)
+        )
+        assert len(result.scalars().all()) == 1
+
     @pytest.mark.asyncio
     async def test_password_reset_request_nonexistent(self, client):
         """Test password reset request for nonexistent user."""
@@ -191,6 +208,33 @@ class TestAuthentication:
         
         assert response.status_code == 400
 
+    @pytest.mark.asyncio
+    async def test_set_password_token_redeemed_once(self, client, admin_user, admin_auth_headers, test_company):
+        """Test an invite token activates the account and cannot be reused."""
+        invite_response = await client.post(
+            "/api/v1/admin/invite",
+            json={
+                "email": f"invited_{uuid4().hex[:8]}@test.com",
+                "first_name": "Invited",
+                "last_name": "User",
+                "role": "user",
+                "company_id": str(test_company.id)
+            },
+            headers=admin_auth_headers
+        )
+        payload = {
+            "token": invite_response.json()["invite_token"],
+            "password": "Newpassword123!",
+            "confirm_password": "Newpassword123!"
+        }
+
+        first = await client.post("/api/v1/auth/set-password", json=payload)
+        assert first.status_code == 200
+        assert first.json()["is_active"] is True
+
+        second = await client.post("/api/v1/auth/set-password", json=payload)
+        assert second.status_code == 400
+
 
 # =============================================================================
 # User Profile Tests
@@ -259,6 +303,36 @@ class TestUserProfile:
         data = response.json()
         assert data["email"] == regular_user.email
 
+    @pytest.mark.asyncio
+    async def test_list_users_defaults_to_own_company(
+        self, client, admin_user, admin_auth_headers, user_from_other_company
+    ):
+        """Test admins list their own company unless another company is requested."""
+        response = await client.get("/api/v1/users/", params={"limit": 1000}, headers=admin_auth_headers)
+
+        assert response.status_code == 200
+        assert {user["company_id"] for user in response.json()} == {str(admin_user.company_id)}
+
+        response = await client.get(
+            "/api/v1/users/",
+            params={"company_id": str(user_from_other_company.company_id)},
+            headers=admin_auth_headers
+        )
+        assert user_from_other_company.email in [user["email"] for user in response.json()]
+
+    @pytest.mark.asyncio
+    async def test_manager_cannot_list_other_company_users(
+        self, client, manager_user, manager_auth_headers, test_company2
+    ):
+        """Test managers cannot list users of another company."""
+        response = await client.get(
+            "/api/v1/users/",
+            params={"company_id": str(test_company2.id)},
+            headers=manager_auth_headers
+        )
+
+        assert response.status_code == 403
+
 
 # =============================================================================
 # Vacation Request Tests
@@ -657,6 +731,55 @@ class TestAdminEndpoints:
         data = response.json()
         assert isinstance(data, list)
 
+    @pytest.mark.asyncio
+    async def test_admin_user_list_rows_match_user_response(self, client, admin_user, admin_auth_headers):
+        """Test the projected user list serializes exactly the UserResponse fields."""
+        from app.schemas import UserResponse
+
+        response = await client.get(
+            "/api/v1/admin/users",
+            headers=admin_auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data
+        assert set(data[0]) == set(UserResponse.model_fields)
+
+    @pytest.mark.asyncio
+    async def test_admin_user_list_keyset_pagination(
+        self, client, admin_user, regular_user, manager_user, admin_auth_headers
+    ):
+        """Test that user list pages continue from the last user without overlap."""
+        full = await client.get(
+            "/api/v1/admin/users",
+            params={"limit": 1000},
+            headers=admin_auth_headers
+        )
+        expected = [user["id"] for user in full.json()][:3]
+
+        first = await client.get(
+            "/api/v1/admin/users",
+            params={"limit": 1},
+            headers=admin_auth_headers
+        )
+        page = first.json()
+
+        second = await client.get(
+            "/api/v1/admin/users",
+            params={"limit": 2, "after_created_at": page[-1]["created_at"], "after_id": page[-1]["id"]},
+            headers=admin_auth_headers
+        )
+        assert second.status_code == 200
+        assert [user["id"] for user in page + second.json()] == expected
+
+        partial = await client.get(
+            "/api/v1/admin/users",
+            params={"after_id": page[-1]["id"]},
+            headers=admin_auth_headers
+        )
+        assert partial.status_code == 400
+
     @pytest.mark.asyncio
     async def test_manager_cannot_list_all_users(self, client, manager_user, manager_auth_headers):
         """Test manager cannot list all users."""
@@ -748,6 +871,33 @@ class TestAdminEndpoints:
         assert "user_id" in data
         assert data["message"] == "User invited successfully"
 
+    @pytest.mark.asyncio
+    async def test_admin_invite_adds_team_memberships(
+        self, client, admin_user, admin_auth_headers, db_session, test_company, test_team, test_team2
+    ):
+        """Test inviting a user into several teams creates each membership once."""
+        from app.models import TeamMembership
+        from sqlalchemy import select
+
+        response = await client.post(
+            "/api/v1/admin/invite",
+            json={
+                "email": f"invited_{uuid4().hex[:8]}@test.com",
+                "first_name": "Invited",
+                "last_name": "User",
+                "role": "user",
+                "company_id": str(test_company.id),
+                "team_ids": [str(test_team.id), str(test_team2.id), str(test_team.id)]
+            },
+            headers=admin_auth_headers
+        )
+
+        assert response.status_code == 200
+        result = await db_session.execute(
+            select(TeamMembership.team_id).where(TeamMembership.user_id == UUID(response.json()["user_id"]))
+        )
+        assert sorted(result.scalars()) == sorted([test_team.id, test_team2.id])
+
     @pytest.mark.asyncio
     async def test_admin_can_update_user(self, client, admin_user, admin_auth_headers, regular_user):
         """Test admin can update a user."""
@@ -769,7 +919,7 @@ class TestAdminEndpoints:
         # Create a new user
         user = User(
             email=f"deactivate_{uuid4().hex[:8]}@test.com",
-            hashed_password=hash_password("password123"),
+            hashed_password=await hash_password("password123"),
             first_name="ToDeactivate",
             last_name="User",
             role=UserRole.USER,
@@ -810,6 +960,21 @@ class TestAdminEndpoints:
         
         assert response.status_code == 200
 
+    @pytest.mark.asyncio
+    async def test_removing_last_team_demotes_manager(self, client, admin_user, admin_auth_headers, manager_user, test_team):
+        """Test that removing a manager's only assignment demotes them in the same transaction."""
+        response = await client.delete(
+            f"/api/v1/admin/teams/{test_team.id}/managers/{manager_user.id}",
+            headers=admin_auth_headers
+        )
+        assert response.status_code == 200
+        
+        user_response = await client.get(
+            f"/api/v1/admin/users/{manager_user.id}",
+            headers=admin_auth_headers
+        )
+        assert user_response.json()["role"] == "user"
+
     @pytest.mark.asyncio
     async def test_admin_can_add_team_member(self, client, admin_user, admin_auth_headers, regular_user, test_team):
         """Test admin can add a user to a team."""
@@ -821,6 +986,55 @@ class TestAdminEndpoints:
         assert response.status_code == 200
         assert "message" in response.json()
 
+    @pytest.mark.asyncio
+    async def test_admin_can_add_team_members_in_batch(self, client, admin_user, admin_auth_headers, regular_user, test_team2):
+        """Test admin can add several users to a team at once; members are skipped."""
+        payload = {"user_ids": [str(regular_user.id), str(admin_user.id), str(regular_user.id)]}
+        response = await client.post(
+            f"/api/v1/admin/teams/{test_team2.id}/members:batch",
+            json=payload,
+            headers=admin_auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["message"] == "2 user(s) added to team"
+        
+        repeat = await client.post(
+            f"/api/v1/admin/teams/{test_team2.id}/members:batch",
+            json=payload,
+            headers=admin_auth_headers
+        )
+        assert repeat.json()["message"] == "0 user(s) added to team"
+
+    @pytest.mark.asyncio
+    async def test_admin_can_assign_team_managers_in_batch(self, client, admin_user, admin_auth_headers, regular_user, test_team2):
+        """Test admin can assign several managers at once and plain users are promoted."""
+        response = await client.post(
+            f"/api/v1/admin/teams/{test_team2.id}/managers:batch",
+            json={"user_ids": [str(regular_user.id)]},
+            headers=admin_auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["message"] == "1 team manager(s) assigned"
+        
+        user_response = await client.get(
+            f"/api/v1/admin/users/{regular_user.id}",
+            headers=admin_auth_headers
+        )
+        assert user_response.json()["role"] == "manager"
+
+    @pytest.mark.asyncio
+    async def test_batch_manager_from_other_company_rejected(self, client, admin_user, admin_auth_headers, user_from_other_company, test_team2):
+        """Test a batch manager assignment fails if a user is in another company."""
+        response = await client.post(
+            f"/api/v1/admin/teams/{test_team2.id}/managers:batch",
+            json={"user_ids": [str(user_from_other_company.id)]},
+            headers=admin_auth_headers
+        )
+        
+        assert response.status_code == 400
+
     @pytest.mark.asyncio
     async def test_admin_can_remove_team_member(self, client, admin_user, admin_auth_headers, regular_user, test_team):
         """Test admin can remove a user from a team."""
@@ -854,6 +1068,37 @@ class TestAdminEndpoints:
         data = response.json()
         assert isinstance(data, list)
 
+    @pytest.mark.asyncio
+    async def test_audit_logs_keyset_pagination(self, client, db_session, admin_user, admin_auth_headers):
+        """Test that audit log pages continue from the last entry without overlap."""
+        from app.audit import log_audit
+        from app.models import AuditAction
+        
+        for _ in range(3):
+            await log_audit(db_session, admin_user, AuditAction.USER_UPDATED, "user", admin_user.id)
+        
+        full = await client.get(
+            "/api/v1/admin/audit-logs",
+            params={"limit": 1000},
+            headers=admin_auth_headers
+        )
+        expected = [entry["id"] for entry in full.json()][:4]
+        
+        first = await client.get(
+            "/api/v1/admin/audit-logs",
+            params={"limit": 2},
+            headers=admin_auth_headers
+        )
+        page = first.json()
+        
+        second = await client.get(
+            "/api/v1/admin/audit-logs",
+            params={"limit": 2, "after_created_at": page[-1]["created_at"], "after_id": page[-1]["id"]},
+            headers=admin_auth_headers
+        )
+        assert second.status_code == 200
+        assert [entry["id"] for entry in page + second.json()] == expected
+
 
 # =============================================================================
 # Export Tests
@@ -884,6 +1129,18 @@ class TestExports:
         assert response.status_code == 200
         assert "openxmlformats" in response.headers.get("content-type", "")
 
+    @pytest.mark.asyncio
+    async def test_export_unknown_status_rejected(self, client, regular_user, user_auth_headers):
+        """Test an unknown status filter is a validation error, not a server error."""
+        for fmt in ("csv", "xlsx"):
+            response = await client.get(
+                f"/api/v1/export/{fmt}",
+                params={"status": "bogus"},
+                headers=user_auth_headers
+            )
+            
+            assert response.status_code == 422
+
     @pytest.mark.asyncio
     async def test_manager_can_export_team_requests(self, client, manager_user, manager_auth_headers):
         """Test manager can export team requests."""
@@ -0,0 +1,107 @@
+"""Tests for audit logging."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models import AuditAction, AuditLog
+
+
+class TestAuditLogQueue:
+    """Tests for the batched audit log writer."""
+
+    @pytest.mark.asyncio
+    async def test_queued_entries_written_on_stop(self, db_session, admin_user, monkeypatch):
+        """Test that queued entries are committed in a batch when the writer stops."""
+        import app.audit_queue as audit_queue_module
+        from app.audit import log_audit
+
+        session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+        @asynccontextmanager
+        async def test_db_context():
+            async with session_factory() as session:
+                yield session
+                await session.commit()
+
+        monkeypatch.setattr(audit_queue_module, "get_db_context", test_db_context)
+        queue = audit_queue_module.AuditLogQueue(batch_size=10, flush_interval=5)
+        monkeypatch.setattr("app.audit.audit_queue", queue)
+
+        queue.start()
+        for _ in range(3):
+            await log_audit(db_session, admin_user, AuditAction.USER_UPDATED, "user", admin_user.id)
+        await queue.stop()
+
+        result = await db_session.execute(
+            select(AuditLog).where(AuditLog.actor_id == admin_user.id)
+        )
+        assert len(result.scalars().all()) == 3
+
+    @pytest.mark.asyncio
+    async def test_queued_entry_keeps_event_time(self, db_session, admin_user, monkeypatch):
+        """Test that a queued entry is stored with the id and time of the action."""
+        import app.audit_queue as audit_queue_module
+        from app.audit import log_audit
+
+        session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+        @asynccontextmanager
+        async def test_db_context():
+            async with session_factory() as session:
+                yield session
+                await session.commit()
+
+        monkeypatch.setattr(audit_queue_module, "get_db_context", test_db_context)
+        queue = audit_queue_module.AuditLogQueue(batch_size=10, flush_interval=5)
+        monkeypatch.setattr("app.audit.audit_queue", queue)
+
+        queue.start()
+        log = await log_audit(db_session, admin_user, AuditAction.USER_UPDATED, "user", admin_user.id)
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+        stored = await db_session.scalar(select(AuditLog).where(AuditLog.id == log.id))
+        assert stored is not None
+        assert stored.created_at.replace(tzinfo=None) == log.created_at.replace(tzinfo=None)
+
+    @pytest.mark.asyncio
+    async def test_failed_copy_falls_back_to_insert(self, db_session, admin_user, monkeypatch):
+        """Test that a batch is still written with INSERT when COPY fails."""
+        from types import SimpleNamespace
+
+        import app.audit_queue as audit_queue_module
+        from app.audit import log_audit
+
+        session_factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+        @asynccontextmanager
+        async def test_db_context():
+            async with session_factory() as session:
+                yield session
+                await session.commit()
+
+        copy_attempts = []
+
+        async def failing_copy(batch):
+            copy_attempts.append(len(batch))
+            raise RuntimeError("COPY unavailable")
+
+        monkeypatch.setattr(audit_queue_module, "get_db_context", test_db_context)
+        monkeypatch.setattr(audit_queue_module, "engine", SimpleNamespace(dialect=SimpleNamespace(driver="asyncpg")))
+        queue = audit_queue_module.AuditLogQueue(batch_size=10, flush_interval=5)
+        monkeypatch.setattr(queue, "_copy", failing_copy)
+        monkeypatch.setattr("app.audit.audit_queue", queue)
+
+        queue.start()
+        for _ in range(2):
+            await log_audit(db_session, admin_user, AuditAction.USER_UPDATED, "user", admin_user.id)
+        await queue.stop()
+
+        result = await db_session.execute(
+            select(AuditLog).where(AuditLog.actor_id == admin_user.id)
+        )
+        assert copy_attempts == [2]
+        assert len(result.scalars().all()) == 2
@@ -6,59 +6,85 @@ from datetime import datetime, timedelta, timezone
 class TestPasswordHashing:
     """Tests for password hashing functions."""
     
-    def test_password_hash_is_different_from_plain(self):
+    @pytest.mark.asyncio
+    async def test_password_hash_is_different_from_plain(self):
         """Test that hashed password is different from plain password."""
         from app.auth import hash_password, verify_password
         
         password = "testpassword123"
-        hashed = hash_password(password)
+        hashed = await hash_password(password)
         
         assert hashed != password
         assert len(hashed) > len(password)
     
-    def test_verify_correct_password(self):
+    @pytest.mark.asyncio
+    async def test_verify_correct_password(self):
         """Test that correct password is verified."""
         from app.auth import hash_password, verify_password
         
         password = "testpassword123"
-        hashed = hash_password(password)
+        hashed = await hash_password(password)
         
-        assert verify_password(password, hashed) is True
+        assert await verify_password(password, hashed) is True
     
-    def test_verify_incorrect_password(self):
+    @pytest.mark.asyncio
+    async def test_verify_incorrect_password(self):
         """Test that incorrect password is not verified."""
         from app.auth import hash_password, verify_password
         
         password = "testpassword123"
         wrong_password = "wrongpassword"
-        hashed = hash_password(password)
+        hashed = await hash_password(password)
         
-        assert verify_password(wrong_password, hashed) is False
+        assert await verify_password(wrong_password, hashed) is False
     
-    def test_argon2id_prefix(self):
+    @pytest.mark.asyncio
+    async def test_argon2id_prefix(self):
         """Test that Argon2id prefix is present in hash."""
         from app.auth import hash_password
         
         password = "testpassword"
-        hashed = hash_password(password)
+        hashed = await hash_password(password)
         
         # Argon2id hashes start with $argon2id$
         assert "$argon2id$" in hashed
     
-    def test_hash_uniqueness(self):
+    @pytest.mark.asyncio
+    async def test_hash_uniqueness(self):
         """Test that same password produces different hashes (salt)."""
         from app.auth import hash_password, verify_password
         
         password = "samepassword"
-        hash1 = hash_password(password)
-        hash2 = hash_password(password)
+        hash1 = await hash_password(password)
+        hash2 = await hash_password(password)
         
         # Different hashes due to different salts
         assert hash1 != hash2
         
         # But both should verify correctly
-        assert verify_password(password, hash1) is True
-        assert verify_password(password, hash2) is True
+        assert await verify_password(password, hash1) is True
+        assert await verify_password(password, hash2) is True
+
+    @pytest.mark.asyncio
+    async def test_verify_hash_with_legacy_parameters(self):
+        """Test that hashes created with other parameters still verify."""
+        from argon2 import PasswordHasher
+        from app.auth import verify_password, _ARGON2_PREFIX
+
+        legacy = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1)
+        hashed = legacy.hash("legacypassword")
+
+        assert not hashed.startswith(_ARGON2_PREFIX)
+        assert await verify_password("legacypassword", hashed) is True
+        assert await verify_password("wrongpassword", hashed) is False
+
+    @pytest.mark.asyncio
+    async def test_verify_non_argon2_hash(self):
+        """Test that a non-Argon2 hash is rejected without verification."""
+        from app.auth import verify_password
+
+        assert await verify_password("password", "$2b$12$notanargon2hash") is False
+        assert await verify_password("password", "") is False
 
 
 class TestJWT:
@@ -149,9 +175,116 @@ class TestJWT:
         # Expired token should raise HTTPException
         with pytest.raises(HTTPException) as exc_info:
             decode_token(expired_token)
-        
+
         assert exc_info.value.status_code == 401
 
+    def test_decode_token_reuses_cached_payload(self):
+        """Test that decoding the same token twice hits the payload cache."""
+        from app.auth import create_access_token, decode_token, _token_cache
+        from app.models import UserRole
+
+        token = create_access_token(
+            user_id=__import__("uuid").uuid4(),
+            email="test@example.com",
+            role=UserRole.USER,
+            company_id=__import__("uuid").uuid4()
+        )
+
+        first = decode_token(token)
+        assert _token_cache.get(token) is first
+        assert decode_token(token) is first
+
+    def test_encode_token_matches_jose(self):
+        """Test that the precomputed-header encoder matches jwt.encode."""
+        from jose import jwt
+        from app.auth import _encode_token
+        from app.config import settings
+
+        now = datetime.now(timezone.utc)
+        payload = {
+            "sub": str(__import__("uuid").uuid4()),
+            "exp": now + timedelta(minutes=15),
+            "iat": now,
+            "type": "access"
+        }
+
+        assert _encode_token(payload) == jwt.encode(
+            payload, settings.jwt_secret, algorithm=settings.jwt_algorithm
+        )
+
+    def test_decode_token_matches_jose(self):
+        """Test that the orjson decoder agrees with jwt.decode."""
+        from jose import jwt
+        from app.auth import _decode_token, create_access_token
+        from app.config import settings
+        from app.models import UserRole
+
+        token = create_access_token(
+            user_id=__import__("uuid").uuid4(),
+            email="test@example.com",
+            role=UserRole.USER,
+            company_id=__import__("uuid").uuid4()
+        )
+
+        assert _decode_token(token) == jwt.decode(
+            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
+        )
+
+    def test_decode_token_rejects_tampered_and_expired(self):
+        """Test that the orjson decoder checks the signature and expiry."""
+        from jose import JWTError
+        from app.auth import _decode_token, _encode_token
+
+        now = datetime.now(timezone.utc)
+        token = _encode_token({"sub": "user", "exp": now + timedelta(minutes=5)})
+        header, payload, signature = token.split(".")
+        forged = _encode_token({"sub": "admin", "exp": now + timedelta(minutes=5)}).split(".")[1]
+        expired = _encode_token({"sub": "user", "exp": now - timedelta(minutes=5)})
+
+        with pytest.raises(JWTError):
+            _decode_token(f"{header}.{forged}.{signature}")
+        with pytest.raises(JWTError):
+            _decode_token(expired)
+
+    def test_decode_non_ascii_token(self):
+        """Test that a non-ASCII token with the known header is rejected with 401."""
+        from fastapi import HTTPException
+        from app.auth import _encode_token, decode_token
+
+        header = _encode_token({"sub": "user"}).split(".")[0]
+        with pytest.raises(HTTPException) as exc_info:
+            decode_token(f"{header}.abc\xe9.sig")
+
+        assert exc_info.value.status_code == 401
+
+
+class TestTTLCache:
+    """Tests for the in-memory TTL cache."""
+
+    def test_expired_entry_is_dropped(self):
+        """Test that entries are not served past their TTL."""
+        from app.cache import TTLCache
+
+        cache = TTLCache(maxsize=10, ttl=30)
+        cache.set("live", 1)
+        cache.set("dead", 2, ttl=0)
+
+        assert cache.get("live") == 1
+        assert cache.get("dead") is None
+
+    def test_oldest_entry_evicted_when_full(self):
+        """Test that the oldest entry is evicted at capacity."""
+        from app.cache import TTLCache
+
+        cache = TTLCache(maxsize=2, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
 
 class TestLogin:
     """Tests for user login."""
@@ -290,6 +423,43 @@ class TestGetCurrentUser:
         assert data["email"] == manager_user.email
         assert data["role"] == "manager"
 
+    @pytest.mark.asyncio
+    async def test_get_current_user_served_from_cache(self, client, regular_user, user_auth_headers):
+        """Test that the authenticated user is cached and can be invalidated."""
+        from app.auth import _user_cache, invalidate_user_cache
+
+        response = await client.get("/api/v1/auth/me", headers=user_auth_headers)
+        assert response.status_code == 200
+        assert _user_cache.get(regular_user.id)["email"] == regular_user.email
+
+        # Second request is served from the cache
+        response = await client.get("/api/v1/auth/me", headers=user_auth_headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == regular_user.email
+
+        invalidate_user_cache(regular_user.id)
+        assert _user_cache.get(regular_user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_user_by_email_served_from_cache(self, db_session, regular_user):
+        """Test that email lookups reuse the user cache and follow invalidation."""
+        from app.auth import get_user_by_email, invalidate_user_cache, _user_email_index
+
+        invalidate_user_cache(regular_user.id)
+        db_session.expunge_all()
+        user = await get_user_by_email(db_session, regular_user.email)
+        assert user.id == regular_user.id
+        assert _user_email_index.get(regular_user.email) == regular_user.id
+
+        db_session.expunge_all()
+        cached = await get_user_by_email(db_session, regular_user.email)
+        assert cached.id == regular_user.id
+        assert cached.hashed_password == regular_user.hashed_password
+
+        invalidate_user_cache(regular_user.id)
+        db_session.expunge_all()
+        assert (await get_user_by_email(db_session, regular_user.email)).id == regular_user.id
+
 
 class TestTokenRefresh:
     """Tests for token refresh functionality."""
@@ -329,6 +499,18 @@ class TestTokenRefresh:
         
         assert response.status_code == 401
 
+    @pytest.mark.asyncio
+    async def test_refresh_token_consumed_once(self, db_session, regular_user):
+        """Test that a refresh token can only be consumed once."""
+        from app.auth import create_and_store_refresh_token, consume_refresh_token
+
+        refresh_token, _ = await create_and_store_refresh_token(db_session, regular_user.id)
+        await db_session.commit()
+
+        assert await consume_refresh_token(db_session, refresh_token) == regular_user.id
+        assert await consume_refresh_token(db_session, refresh_token) is None
+        await db_session.rollback()
+
 
 class TestInviteFlow:
     """Tests for invite/set-password flow."""
@@ -399,6 +581,38 @@ class TestInviteFlow:
         
         assert login_response.status_code == 401
 
+    @pytest.mark.asyncio
+    async def test_create_invite_tokens_in_bulk(self, db_session, admin_user, invited_user):
+        """Test that bulk invite tokens are unique and share one expiry."""
+        from app.auth import create_invite_tokens
+
+        invites = create_invite_tokens(
+            db_session, [invited_user.id, invited_user.id], created_by=admin_user.id
+        )
+        await db_session.commit()
+
+        assert len({invite.token for invite in invites}) == 2
+        assert all(len(invite.token) == 43 for invite in invites)
+        assert invites[0].expires_at == invites[1].expires_at
+
+    @pytest.mark.asyncio
+    async def test_invite_token_stored_as_hash(self, db_session, admin_user, invited_user):
+        """Test that only the token hash is persisted."""
+        from sqlalchemy import select
+        from app.auth import create_invite_token
+        from app.models import InviteToken, hash_token
+
+        invite = create_invite_token(db_session, invited_user.id, created_by=admin_user.id)
+        await db_session.commit()
+        db_session.expunge_all()
+
+        result = await db_session.execute(
+            select(InviteToken).where(InviteToken.token_hash == hash_token(invite.token))
+        )
+        stored = result.scalar_one()
+        assert stored.token is None
+        assert len(stored.token_hash) == 32
+
 
 class TestLogout:
     """Tests for logout functionality."""
@@ -0,0 +1,144 @@
+"""Tests for database session helpers."""
+import pytest
+from sqlalchemy import select, update
+
+from app.database import _has_pending_writes
+from app.models import Company, uuid7
+
+
+class TestWriteTracking:
+    """Tests for commit-on-write detection used by get_db."""
+
+    @pytest.mark.asyncio
+    async def test_read_only_session_has_no_writes(self, db_session, test_company):
+        """Test that SELECTs alone do not require a commit."""
+        await db_session.execute(select(Company).where(Company.id == test_company.id))
+
+        assert _has_pending_writes(db_session) is False
+
+    @pytest.mark.asyncio
+    async def test_core_update_requires_commit(self, db_session, test_company):
+        """Test that an executed UPDATE is detected and cleared by commit."""
+        await db_session.execute(
+            update(Company).where(Company.id == test_company.id).values(name=test_company.name)
+        )
+        assert _has_pending_writes(db_session) is True
+
+        await db_session.commit()
+        assert _has_pending_writes(db_session) is False
+
+    @pytest.mark.asyncio
+    async def test_pending_object_requires_commit(self, db_session):
+        """Test that added but unflushed objects are detected."""
+        db_session.add(Company(name="Pending Company"))
+
+        assert _has_pending_writes(db_session) is True
+        await db_session.rollback()
+
+
+class TestHealthCheck:
+    """Tests for the cached database liveness check."""
+
+    @pytest.mark.asyncio
+    async def test_result_reused_within_ttl(self, db_session, monkeypatch):
+        """Test that a second check within the TTL does not reconnect."""
+        import app.database as database
+
+        connects = []
+        engine = db_session.bind
+
+        class CountingEngine:
+            def connect(self):
+                connects.append(1)
+                return engine.connect()
+
+        monkeypatch.setattr(database, "engine", CountingEngine())
+        database._db_health_cache.clear()
+
+        assert await database.check_db_connection() is True
+        assert await database.check_db_connection() is True
+        assert len(connects) == 1
+        database._db_health_cache.clear()
+
+
+class TestUpdatedAtTrigger:
+    """Tests for database-maintained updated_at columns."""
+
+    @pytest.mark.asyncio
+    async def test_update_touches_updated_at(self, db_session, test_company):
+        """Test that an UPDATE without updated_at refreshes it; explicit values are kept."""
+        from datetime import datetime
+
+        past = datetime(2000, 1, 1)
+        await db_session.execute(
+            update(Company).where(Company.id == test_company.id).values(updated_at=past)
+        )
+        stored = await db_session.scalar(
+            select(Company.updated_at).where(Company.id == test_company.id)
+        )
+        assert stored.year == 2000
+
+        await db_session.execute(
+            update(Company).where(Company.id == test_company.id).values(name=test_company.name)
+        )
+        stored = await db_session.scalar(
+            select(Company.updated_at).where(Company.id == test_company.id)
+        )
+        assert stored.year > 2000
+        await db_session.rollback()
+
+
+class TestUUID7:
+    """Tests for time-ordered primary key generation."""
+
+    def test_version_and_variant(self):
+        """Test that generated ids are RFC 9562 version 7 UUIDs."""
+        value = uuid7()
+
+        assert value.version == 7
+        assert value.variant == "specified in RFC 4122"
+
+    def test_ids_sort_by_creation_time(self):
+        """Test that ids from later milliseconds sort after earlier ones."""
+        import time
+
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+
+        assert str(first) < str(second)
+
+
+class TestSmallIntEnum:
+    """Tests for SMALLINT enum storage."""
+
+    @pytest.mark.asyncio
+    async def test_role_stored_as_code(self, db_session, admin_user):
+        """Test that roles are stored as ordinals and loaded as members."""
+        from sqlalchemy import text
+        from app.models import User, UserRole
+
+        stored = await db_session.scalar(
+            text("SELECT role FROM users WHERE email = :email"), {"email": admin_user.email}
+        )
+        assert stored == list(UserRole).index(UserRole.ADMIN)
+
+        db_session.expunge_all()
+        user = await db_session.scalar(select(User).where(User.role == UserRole.ADMIN))
+        assert user.role is UserRole.ADMIN
+
+
+class TestUserFullName:
+    """Tests for the full_name hybrid property."""
+
+    @pytest.mark.asyncio
+    async def test_filter_by_full_name(self, db_session, admin_user):
+        """Test that full_name works on instances and in SQL."""
+        from app.models import User
+
+        user = await db_session.scalar(
+            select(User).where(User.full_name == admin_user.full_name, User.email == admin_user.email)
+        )
+
+        assert user.id == admin_user.id
+        assert user.full_name == f"{admin_user.first_name} {admin_user.last_name}"
@@ -0,0 +1,250 @@
+"""Tests for the CORS, CSRF and rate limit middleware."""
+from collections import deque
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.middleware.cors import CORSMiddleware
+from app.middleware.csrf import CSRFMiddleware
+from app.middleware.rate_limit import AccountLockoutStore, RateLimitMiddleware
+
+
+def _make_app(middleware) -> FastAPI:
+    """Build a minimal app wrapped in the given middleware."""
+    app = FastAPI()
+
+    @app.get("/api/v1/items")
+    async def list_items():
+        return {"items": []}
+
+    @app.post("/api/v1/items")
+    async def create_item():
+        return {"created": True}
+
+    app.add_middleware(middleware)
+    return app
+
+
+class TestCORSMiddleware:
+    """Tests for cross-origin headers and preflight handling."""
+
+    @pytest.mark.asyncio
+    async def test_allowed_origin_echoed(self):
+        """Test that an allowed origin is echoed with credentials allowed."""
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CORSMiddleware)), base_url="http://test") as ac:
+            response = await ac.get("/api/v1/items", headers={"Origin": "http://vacation.local"})
+
+        assert response.headers["access-control-allow-origin"] == "http://vacation.local"
+        assert response.headers["access-control-allow-credentials"] == "true"
+        assert response.headers["vary"] == "Origin"
+
+    @pytest.mark.asyncio
+    async def test_foreign_origin_not_echoed(self):
+        """Test that an unknown origin gets no allow-origin header."""
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CORSMiddleware)), base_url="http://test") as ac:
+            response = await ac.get("/api/v1/items", headers={"Origin": "http://evil.example"})
+
+        assert response.status_code == 200
+        assert "access-control-allow-origin" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_preflight(self):
+        """Test that preflights are answered without reaching the app."""
+        preflight = {"Access-Control-Request-Method": "POST", "Access-Control-Request-Headers": "authorization"}
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CORSMiddleware)), base_url="http://test") as ac:
+            allowed = await ac.options("/api/v1/items", headers={"Origin": "http://vacation.local", **preflight})
+            denied = await ac.options("/api/v1/items", headers={"Origin": "http://evil.example", **preflight})
+
+        assert allowed.status_code == 200
+        assert allowed.headers["access-control-allow-origin"] == "http://vacation.local"
+        assert allowed.headers["access-control-allow-headers"] == "authorization"
+        assert denied.status_code == 400
+        assert denied.text == "Disallowed CORS origin"
+
+
+    @pytest.mark.asyncio
+    async def test_wildcard_entry_not_widened(self, monkeypatch):
+        """Test that CORS matches origins exactly, unlike the CSRF wildcard rule."""
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "cors_origins", ["https://app.example.com*"])
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CORSMiddleware)), base_url="http://test") as ac:
+            response = await ac.get("/api/v1/items", headers={"Origin": "https://app.example.com.attacker.net"})
+
+        assert "access-control-allow-origin" not in response.headers
+
+
+class TestCSRFMiddleware:
+    """Tests for Origin/Referer validation."""
+
+    @pytest.mark.asyncio
+    async def test_allowed_origin_passes(self):
+        """Test that a configured origin may POST."""
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CSRFMiddleware)), base_url="http://test") as ac:
+            response = await ac.post("/api/v1/items", headers={"Origin": "http://vacation.local"})
+
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_foreign_origin_rejected(self):
+        """Test that an unknown origin is rejected with a JSON 403."""
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CSRFMiddleware)), base_url="http://test") as ac:
+            response = await ac.post("/api/v1/items", headers={"Origin": "http://evil.example"})
+
+        assert response.status_code == 403
+        assert response.json() == {"detail": "CSRF validation failed: Invalid origin"}
+
+    @pytest.mark.asyncio
+    async def test_foreign_referer_rejected(self):
+        """Test that an unknown referer is rejected."""
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CSRFMiddleware)), base_url="http://test") as ac:
+            response = await ac.post("/api/v1/items", headers={"Referer": "http://evil.example/page"})
+
+        assert response.status_code == 403
+        assert response.json() == {"detail": "CSRF validation failed: Invalid referer"}
+
+    @pytest.mark.asyncio
+    async def test_safe_method_skips_validation(self):
+        """Test that GET requests are not checked."""
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CSRFMiddleware)), base_url="http://test") as ac:
+            response = await ac.get("/api/v1/items", headers={"Origin": "http://evil.example"})
+
+        assert response.status_code == 200
+
+
+    @pytest.mark.asyncio
+    async def test_wildcard_origin_matches(self, monkeypatch):
+        """Test that wildcard origins match by prefix for Origin and Referer."""
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "cors_origins", ["http://localhost:*"])
+        async with AsyncClient(transport=ASGITransport(app=_make_app(CSRFMiddleware)), base_url="http://test") as ac:
+            allowed = await ac.post("/api/v1/items", headers={"Origin": "http://localhost:5173"})
+            referer = await ac.post("/api/v1/items", headers={"Referer": "http://localhost:3000/teams"})
+            denied = await ac.post("/api/v1/items", headers={"Origin": "http://evil.example"})
+
+        assert allowed.status_code == 200
+        assert referer.status_code == 200
+        assert denied.status_code == 403
+
+
+class TestRateLimitMiddleware:
+    """Tests for per-client request limits."""
+
+    @pytest.mark.asyncio
+    async def test_requests_over_limit_rejected(self, monkeypatch):
+        """Test that requests beyond the limit get a JSON 429."""
+        monkeypatch.setitem(RateLimitMiddleware.DEFAULT_LIMITS, "/api/v1/items", 2)
+        async with AsyncClient(transport=ASGITransport(app=_make_app(RateLimitMiddleware)), base_url="http://test") as ac:
+            statuses = [(await ac.get("/api/v1/items")).status_code for _ in range(3)]
+            response = await ac.get("/api/v1/items")
+
+        assert statuses == [200, 200, 429]
+        assert response.json() == {"detail": "Too many requests. Please try again later."}
+
+    @pytest.mark.asyncio
+    async def test_least_recent_client_evicted(self, monkeypatch):
+        """Test that the bucket table is capped at MAX_CLIENTS."""
+        async def downstream(scope, receive, send):
+            pass
+
+        monkeypatch.setattr(RateLimitMiddleware, "MAX_CLIENTS", 2)
+        middleware = RateLimitMiddleware(downstream)
+        for host in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            await middleware({"type": "http", "path": "/api/v1/items", "client": (host, 1234)}, None, None)
+
+        assert [key[0] for key in middleware._buckets] == ["10.0.0.2", "10.0.0.3"]
+
+    @pytest.mark.asyncio
+    async def test_idle_buckets_evicted(self):
+        """Test that buckets idle for a full window are dropped."""
+        import time
+
+        async def downstream(scope, receive, send):
+            pass
+
+        middleware = RateLimitMiddleware(downstream)
+        middleware._buckets[("10.0.0.1", 60)] = [0.0, time.monotonic() - 120]
+        await middleware({"type": "http", "path": "/api/v1/items", "client": ("10.0.0.2", 1234)}, None, None)
+
+        assert list(middleware._buckets) == [("10.0.0.2", 60)]
+
+    def test_client_ip_from_forwarded_header(self, monkeypatch):
+        """Test that X-Forwarded-For is used only when proxies are trusted."""
+        from app.config import settings
+
+        scope = {"headers": [(b"x-forwarded-for", b"203.0.113.7, 10.0.0.1")], "client": ("10.0.0.1", 80)}
+
+        assert RateLimitMiddleware(None)._client_ip(scope) == "10.0.0.1"
+        monkeypatch.setattr(settings, "trust_proxy", True)
+        assert RateLimitMiddleware(None)._client_ip(scope) == "203.0.113.7"
+        assert RateLimitMiddleware(None)._client_ip({"headers": [], "client": None}) == "unknown"
+
+
+class TestAccountLockoutStore:
+    """Tests for failed-login tracking."""
+
+    @pytest.mark.asyncio
+    async def test_locks_after_max_attempts(self):
+        """Test that the fifth failure within the window locks the account."""
+        store = AccountLockoutStore()
+        for _ in range(5):
+            store.record_failure("user@test.com")
+
+        allowed, _ = await store.check_login("user@test.com")
+        assert allowed is False
+        assert store.is_locked("user@test.com") is True
+
+    @pytest.mark.asyncio
+    async def test_attempts_outside_window_are_dropped(self):
+        """Test that stale failures no longer count towards a lockout."""
+        store = AccountLockoutStore()
+        store._attempts["user@test.com"] = deque([0.0] * 5)
+        store.record_failure("user@test.com")
+
+        allowed, _ = await store.check_login("user@test.com")
+        assert allowed is True
+        assert len(store._attempts["user@test.com"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_lock_expires_without_timer(self):
+        """Test that an expired lock is lifted on the next check."""
+        store = AccountLockoutStore()
+        store._locked_until["user@test.com"] = 1.0
+
+        allowed, _ = await store.check_login("user@test.com")
+        assert allowed is True
+        assert store.is_locked("user@test.com") is False
+
+    @pytest.mark.asyncio
+    async def test_guard_serializes_attempts_per_email(self):
+        """Test that concurrent attempts for one email run one at a time."""
+        import asyncio
+
+        store = AccountLockoutStore()
+        active = []
+        overlaps = []
+
+        async def attempt():
+            async with store.guard("user@test.com"):
+                overlaps.append(len(active))
+                active.append(1)
+                await asyncio.sleep(0)
+                active.pop()
+
+        await asyncio.gather(*(attempt() for _ in range(5)))
+
+        assert overlaps == [0] * 5
+        assert store._locks == {}
+
+    @pytest.mark.asyncio
+    async def test_checks_do_not_create_entries(self):
+        """Test that checking an unknown email leaves the store empty."""
+        store = AccountLockoutStore()
+
+        allowed, _ = await store.check_login("nobody@test.com")
+        assert allowed is True
+        assert store.is_locked("nobody@test.com") is False
+        assert store._attempts == {}
+        assert store._locked_until == {}